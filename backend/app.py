@@ -63,6 +63,7 @@ logger = logging.getLogger(__name__)
 class CleanRequest(BaseModel):
     text: str
     system_prompt: str | None = None
+    with_title: bool = False  # Also return a title, from the same LLM request
 
 
 class ChatRequest(BaseModel):
@@ -129,8 +130,16 @@ async def lifespan(app: FastAPI):
         fallback_base_url=os.getenv("LLM_FALLBACK_BASE_URL"),
         fallback_api_key=os.getenv("LLM_FALLBACK_API_KEY"),
         fallback_model=os.getenv("LLM_FALLBACK_MODEL"),
+        compute_type=os.getenv("WHISPER_COMPUTE_TYPE", "auto"),
+        # Optional local model, last resort for cleaning
+        tiny_model_path=os.getenv("LLM_TINY_MODEL_PATH"),
     )
 
+    # Optional warmup in the background; requests don't wait for it
+    warmup_task = None
+    if config.WHISPER_WARMUP:
+        warmup_task = asyncio.create_task(asyncio.to_thread(service.warmup))
+
     # Initialize embedding service
     embedding_base_url = os.getenv(
         "EMBEDDING_BASE_URL",
@@ -146,9 +155,21 @@ async def lifespan(app: FastAPI):
         f"Embedding service configured: {embedding_model} at {embedding_base_url}"
     )
 
-    logger.info("Services ready!")
+    whisper_error = service.whisper_load_error()
+    if whisper_error is not None:
+        logger.error(
+            f"Whisper failed to load ({whisper_error}); "
+            "transcription will retry the load on first use"
+        )
+    else:
+        logger.info("Services ready!")
     yield
 
+    if warmup_task is not None:
+        await warmup_task
+    if service:
+        service.close()
+
 
 app = FastAPI(title="AI Transcript App", lifespan=lifespan)
 
@@ -286,7 +307,12 @@ async def update_existing_transcript(
 
 @app.delete("/api/transcripts/{transcript_id}")
 async def delete_existing_transcript(transcript_id: str, db: Session = Depends(get_db)):
-    """Delete a transcript and its chat messages."""
+    """
+    Delete a transcript and its chat messages.
+
+    Raw transcripts cached under TRANSCRIBE_CACHE_DIR are keyed by audio
+    hash, not transcript id, and are not removed here.
+    """
     success = delete_transcript(db, transcript_id)
     if not success:
         api_error("TRANSCRIPT_NOT_FOUND", f"Transcript {transcript_id} not found", 404)
@@ -387,10 +413,18 @@ async def clean_text(request: Request, data: CleanRequest):
         api_error("SERVICE_NOT_READY", "Service not ready", 503)
 
     if not data.text:
+        if data.with_title:
+            return {"success": True, "text": "", "title": "Untitled"}
         return {"success": True, "text": ""}
 
     try:
-        cleaned_text = service.clean_with_llm(
+        if data.with_title:
+            cleaned_text, title = await service.aclean_and_title(
+                data.text, system_prompt=data.system_prompt
+            )
+            return {"success": True, "text": cleaned_text, "title": title}
+
+        cleaned_text = await service.aclean_with_llm(
             data.text, system_prompt=data.system_prompt
         )
         return {"success": True, "text": cleaned_text}
@@ -400,6 +434,20 @@ async def clean_text(request: Request, data: CleanRequest):
         api_error("CLEANING_FAILED", "Text cleaning failed", 500, str(e))
 
 
+@app.post("/api/clean/stream")
+@limiter.limit(config.RATE_LIMIT_CLEAN)
+async def clean_text_stream(request: Request, data: CleanRequest):
+    """Stream cleaned text as plain text while the LLM generates it."""
+    if not service:
+        api_error("SERVICE_NOT_READY", "Service not ready", 503)
+
+    # Sync generator; Starlette iterates it in a worker thread
+    return StreamingResponse(
+        service.clean_with_llm_stream(data.text, system_prompt=data.system_prompt),
+        media_type="text/plain; charset=utf-8",
+    )
+
+
 @app.post("/api/generate-title")
 @limiter.limit(config.RATE_LIMIT_CHAT)
 async def generate_title(request: Request, data: GenerateTitleRequest):
@@ -411,7 +459,7 @@ async def generate_title(request: Request, data: GenerateTitleRequest):
         return {"success": True, "title": "Untitled"}
 
     try:
-        title = service.generate_title(data.text)
+        title = await service.agenerate_title(data.text)
         return {"success": True, "title": title}
 
     except Exception as e:
@@ -491,7 +539,7 @@ async def chat(request: Request, data: ChatRequest, db: Session = Depends(get_db
                 data.context = transcript.cleaned_text or transcript.raw_text
 
     try:
-        response = service.chat(
+        response = await service.achat(
             message=data.message,
             context=data.context,
             chat_history=chat_history,
@@ -21,6 +21,13 @@ def _parse_int(value: str | None, default: int) -> int:
         return default
 
 
+def _parse_bool(value: str | None, default: bool) -> bool:
+    """Parse a boolean (1/true/yes/on) from environment variable."""
+    if not value:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
 def _parse_list(value: str | None, default: list[str]) -> list[str]:
     """Parse a comma-separated list from environment variable."""
     if not value:
@@ -53,9 +60,54 @@ LLM_FALLBACK_BASE_URL = os.getenv("LLM_FALLBACK_BASE_URL")
 LLM_FALLBACK_API_KEY = os.getenv("LLM_FALLBACK_API_KEY")
 LLM_FALLBACK_MODEL = os.getenv("LLM_FALLBACK_MODEL")
 
+# Race the fallback provider against a primary that hasn't started answering
+# within HEDGE_DELAY_MS (async endpoints). Off by default: when on, requests
+# (transcript text included) also go to the fallback provider, which may be a
+# paid remote API
+HEDGED_LLM = _parse_bool(os.getenv("HEDGED_LLM"), False)
+HEDGE_DELAY_MS = _parse_int(os.getenv("HEDGE_DELAY_MS"), 800)
+
+# Mark static system prompts with cache_control for providers that support
+# explicit prompt caching (e.g. Anthropic/OpenRouter); off for plain servers
+LLM_CACHE_CONTROL = _parse_bool(os.getenv("LLM_CACHE_CONTROL"), False)
+
+# Stream cleaning replies and join the deltas (shorter time to first byte);
+# false for endpoints that buffer streamed chunks poorly
+LLM_STREAM_CLEAN = _parse_bool(os.getenv("LLM_STREAM_CLEAN"), True)
+
+# Small local GGUF model for cleaning when remote providers fail (optional)
+LLM_TINY_MODEL_PATH = os.getenv("LLM_TINY_MODEL_PATH")
+
+# Texts shorter than this (chars) skip LLM cleaning under the default prompt
+CLEAN_MIN_CHARS = _parse_int(os.getenv("CLEAN_MIN_CHARS"), 40)
+
 # Whisper model
 WHISPER_MODEL = os.getenv("WHISPER_MODEL", "base.en")
 
+# Whisper beam width; 1 (greedy + temperature fallback) is several times
+# cheaper to decode than 5 with little accuracy difference on most audio
+WHISPER_BEAM_SIZE = _parse_int(os.getenv("WHISPER_BEAM_SIZE"), 1)
+
+# Whisper compute type: auto (int8_float16 on CUDA, int8 on CPU), or any
+# CTranslate2 type such as float16, int8_float32, float32
+WHISPER_COMPUTE_TYPE = os.getenv("WHISPER_COMPUTE_TYPE", "auto")
+
+# Run a dummy transcription and 1-token LLM requests at startup, so the
+# first user request doesn't pay kernel/model initialization
+WHISPER_WARMUP = _parse_bool(os.getenv("WHISPER_WARMUP"), False)
+
+# Worker processes for parallel multi-file transcription on CPU (0 disables)
+WHISPER_CPU_WORKERS = _parse_int(os.getenv("WHISPER_CPU_WORKERS"), 0)
+
+# Raw transcripts are cached here by audio content hash (opt-in; empty
+# disables). Entries outlive deleted transcripts, so clear the directory by hand
+TRANSCRIBE_CACHE_DIR = os.getenv("TRANSCRIBE_CACHE_DIR", "")
+
+# Reuse cleaned text for repeated inputs and titles for near-identical ones
+# (embedding similarity)
+SEMANTIC_CACHE = _parse_bool(os.getenv("SEMANTIC_CACHE"), False)
+SEMANTIC_CACHE_MAX_ENTRIES = _parse_int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES"), 1000)
+
 # =============================================================================
 # Embedding / RAG Configuration
 # =============================================================================
@@ -114,3 +166,6 @@ RATE_LIMIT_CHAT = os.getenv("RATE_LIMIT_CHAT", "30/minute")
 # =============================================================================
 
 MAX_CHAT_HISTORY = _parse_int(os.getenv("MAX_CHAT_HISTORY"), 10)
+# Token budget for those messages; older ones are dropped to fit, so a few
+# very long turns can't blow up the prompt
+CHAT_HISTORY_TOKENS = _parse_int(os.getenv("CHAT_HISTORY_TOKENS"), 2000)
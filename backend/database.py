@@ -277,6 +277,7 @@ def create_transcript(
         title=title,
         raw_text=raw_text,
         cleaned_text=cleaned_text,
+        created_at=utc_now(),
     )
     db.add(transcript)
     db.commit()
@@ -62,6 +62,21 @@ class EmbeddingService:
             response.raise_for_status()
             return response.json()["embedding"]
 
+    def embed_text_sync(
+        self, text: str, client: httpx.Client | None = None
+    ) -> list[float]:
+        """Blocking embed_text() for worker threads, reusing `client` if given."""
+        if client is None:
+            with httpx.Client(timeout=self.timeout) as own_client:
+                return self.embed_text_sync(text, own_client)
+        response = client.post(
+            f"{self.base_url}/api/embeddings",
+            json={"model": self.model, "prompt": text},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return response.json()["embedding"]
+
     async def embed_batch(self, texts: list[str]) -> list[list[float]]:
         """Get embeddings for multiple texts."""
         embeddings = []
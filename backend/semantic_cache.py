@@ -0,0 +1,146 @@
+"""
+Embedding-similarity cache for LLM responses.
+
+Near-identical inputs (re-recorded takes, small edits) reuse a previous
+response instead of making another LLM round-trip.
+"""
+
+import io
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Stored in place of an embedding by exact-match caches
+_NO_VECTOR = np.empty(0, dtype=np.float32)
+
+
+class SemanticCache:
+    """
+    LRU cache of (embedding, response) pairs looked up by cosine similarity.
+
+    `embed` turns text into a vector (e.g. the Ollama embeddings endpoint).
+    A lookup hits when the closest stored input has similarity >= threshold.
+    With threshold=None only the same normalized text hits, and nothing is
+    embedded.
+    Safe to share across threads; embedding calls run outside the lock.
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[str], Sequence[float]],
+        threshold: float | None,
+        max_entries: int = 1000,
+        path: Path | None = None,
+    ):
+        self.embed = embed
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.path = path
+        # Normalized input text -> (unit embedding, response), oldest first
+        self._entries: OrderedDict[str, tuple[np.ndarray, str]] = OrderedDict()
+        # Embedding of the last looked-up text, reused by a following put()
+        self._last: tuple[str, np.ndarray] | None = None
+        self._lock = threading.Lock()
+        if path is not None:
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        return " ".join(text.lower().split())
+
+    def _vector(self, key: str) -> np.ndarray:
+        if self.threshold is None:
+            return _NO_VECTOR
+        # Read once; another thread may replace _last between two reads
+        last = self._last
+        if last is not None and last[0] == key:
+            return last[1]
+        vector = np.array(self.embed(key), dtype=np.float32)
+        vector /= np.linalg.norm(vector) or 1.0
+        self._last = (key, vector)
+        return vector
+
+    def get(self, text: str) -> str | None:
+        """Return the cached response for a similar input, or None."""
+        key = self._normalize(text)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key][1]
+            if not self._entries or self.threshold is None:
+                return None
+
+        vector = self._vector(key)
+        with self._lock:
+            if not self._entries:
+                return None
+            keys = list(self._entries)
+            matrix = np.stack([self._entries[k][0] for k in keys])
+            scores = matrix @ vector
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                return None
+            self._entries.move_to_end(keys[best])
+            logger.debug(f"Semantic cache hit (similarity {scores[best]:.3f})")
+            return self._entries[keys[best]][1]
+
+    def put(self, text: str, response: str) -> None:
+        """Store a response, evicting the least recently used entry if full."""
+        key = self._normalize(text)
+        vector = self._vector(key)
+        with self._lock:
+            self._entries[key] = (vector, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def save(self) -> None:
+        """Write the cache to `path` atomically (no-op without a path)."""
+        if self.path is None:
+            return
+        with self._lock:
+            if not self._entries:
+                return
+            keys = list(self._entries)
+            buffer = io.BytesIO()
+            np.savez(
+                buffer,
+                vectors=np.stack([self._entries[k][0] for k in keys]),
+                keys=json.dumps(keys),
+                responses=json.dumps([self._entries[k][1] for k in keys]),
+            )
+            tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path.write_bytes(buffer.getvalue())
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                logger.warning(f"Could not save semantic cache: {e}")
+                tmp_path.unlink(missing_ok=True)
+
+    def _load(self) -> None:
+        try:
+            with np.load(self.path) as data:
+                keys = json.loads(str(data["keys"]))
+                responses = json.loads(str(data["responses"]))
+                vectors = data["vectors"]
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable semantic cache {self.path}: {e}")
+            return
+        for key, vector, response in zip(keys, vectors, responses, strict=True):
+            self._entries[key] = (vector, response)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
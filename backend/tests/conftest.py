@@ -6,7 +6,8 @@ Provides test database, API client, and mock services.
 
 import os
 import sys
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -19,6 +20,62 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from database import Base, get_db
 
+
+class _APIError(Exception):
+    pass
+
+
+class _APIConnectionError(_APIError):
+    pass
+
+
+class _APIStatusError(_APIError):
+    pass
+
+
+# openai's error hierarchy, as real exception classes so `except` works
+OPENAI_ERRORS = {
+    "APIError": _APIError,
+    "APIConnectionError": _APIConnectionError,
+    "APITimeoutError": type("APITimeoutError", (_APIConnectionError,), {}),
+    "APIStatusError": _APIStatusError,
+    "BadRequestError": type("BadRequestError", (_APIStatusError,), {}),
+    "InternalServerError": type("InternalServerError", (_APIStatusError,), {}),
+    "RateLimitError": type("RateLimitError", (_APIStatusError,), {}),
+}
+
+# CPU-only by default; tests opt into CUDA explicitly
+CTRANSLATE2_DEFAULTS = {
+    "get_cuda_device_count.return_value": 0,
+    "get_supported_compute_types.side_effect": lambda device: {
+        "cpu": {"int8", "int8_float32", "float32"},
+        "cuda": {"int8", "int8_float16", "float16", "float32"},
+    }[device],
+}
+
+# Stand-ins for heavy ML/LLM modules, shared by every test in the session
+HEAVY_MODULE_MOCKS = {
+    "faster_whisper": MagicMock(),
+    "openai": MagicMock(**OPENAI_ERRORS),
+    "ctranslate2": MagicMock(**CTRANSLATE2_DEFAULTS),
+}
+
+
+def pytest_configure(config):
+    """
+    Import the FastAPI app once at startup.
+
+    Loads its dependency graph (FastAPI, slowapi, SQLAlchemy models, ...)
+    during collection so the first test requesting `client` doesn't pay for
+    it. The heavy modules are mocked for the import and dropped afterwards.
+    """
+    with patch.dict("sys.modules", HEAVY_MODULE_MOCKS):
+        import app  # noqa: F401
+
+        loaded = {k: v for k, v in sys.modules.items() if k not in HEAVY_MODULE_MOCKS}
+    sys.modules.update(loaded)
+
+
 # =============================================================================
 # Database Fixtures
 # =============================================================================
@@ -56,29 +113,107 @@ def db_session(test_engine) -> Generator[Session, None, None]:
 # =============================================================================
 
 
-@pytest.fixture(scope="function")
-def mock_transcription_service():
-    """Create a mock TranscriptionService that doesn't require Whisper/LLM."""
-    mock_service = MagicMock()
-    mock_service.transcribe.return_value = "This is transcribed text."
-    mock_service.clean_with_llm.return_value = "This is cleaned text."
-    mock_service.generate_title.return_value = "Test Title"
-    mock_service.get_default_system_prompt.return_value = "You are a helpful assistant."
-    mock_service.chat.return_value = MagicMock(
-        choices=[MagicMock(message=MagicMock(content="Test response"))]
-    )
-    return mock_service
+class FakeTranscriptionService:
+    """
+    Hand-rolled stand-in for TranscriptionService.
 
+    Returns canned responses without the call recording that MagicMock does
+    on every attribute access, so API tests stay cheap and isolated.
+    """
 
-@pytest.fixture(scope="function")
-def mock_whisper_model():
-    """Mock WhisperModel to avoid loading actual model."""
-    mock = MagicMock()
-    mock.transcribe.return_value = (
-        [MagicMock(text="Transcribed text segment.")],
-        MagicMock(language="en"),
+    _CHAT_RESPONSE = SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content="Test response"))]
     )
-    return mock
+
+    def transcribe(self, audio_file: str) -> str:
+        return "This is transcribed text."
+
+    def clean_with_llm(self, text: str, system_prompt: str | None = None) -> str:
+        return "This is cleaned text."
+
+    def clean_with_llm_stream(self, text: str, system_prompt: str | None = None):
+        yield from ("This is ", "cleaned text.") if text else ()
+
+    def generate_title(self, text: str) -> str:
+        return "Test Title" if text else "Untitled"
+
+    def clean_and_title(
+        self, text: str, system_prompt: str | None = None
+    ) -> tuple[str, str]:
+        return self.clean_with_llm(text, system_prompt), self.generate_title(text)
+
+    def whisper_load_error(self) -> BaseException | None:
+        return None
+
+    def get_default_system_prompt(self) -> str:
+        return "You are a helpful assistant."
+
+    def chat(
+        self,
+        message: str,
+        context: str | None = None,
+        chat_history: list[dict] | None = None,
+        relevant_chunks: list[str] | None = None,
+        stream: bool = False,
+    ):
+        return self._CHAT_RESPONSE
+
+    async def aclean_with_llm(self, text: str, system_prompt: str | None = None) -> str:
+        return self.clean_with_llm(text, system_prompt)
+
+    async def aclean_and_title(
+        self, text: str, system_prompt: str | None = None
+    ) -> tuple[str, str]:
+        return self.clean_and_title(text, system_prompt)
+
+    async def agenerate_title(self, text: str) -> str:
+        return self.generate_title(text)
+
+    async def achat(self, message: str, **kwargs):
+        return self.chat(message, **kwargs)
+
+    def close(self) -> None:
+        pass
+
+
+@pytest.fixture(scope="session", autouse=True)
+def mock_heavy_imports():
+    """Mock heavy imports (faster_whisper, openai) once for the whole session."""
+    with patch.dict("sys.modules", HEAVY_MODULE_MOCKS):
+        yield HEAVY_MODULE_MOCKS
+
+
+@pytest.fixture(autouse=True)
+def reset_heavy_mocks():
+    """Undo each test's return_value/side_effect changes to the shared mocks."""
+    yield
+    for mock in HEAVY_MODULE_MOCKS.values():
+        mock.reset_mock(return_value=True, side_effect=True)
+    HEAVY_MODULE_MOCKS["ctranslate2"].configure_mock(**CTRANSLATE2_DEFAULTS)
+
+
+@pytest.fixture(scope="session")
+def mock_faster_whisper(mock_heavy_imports):
+    """The mocked faster_whisper module."""
+    return mock_heavy_imports["faster_whisper"]
+
+
+@pytest.fixture(scope="session")
+def mock_openai(mock_heavy_imports):
+    """The mocked openai module."""
+    return mock_heavy_imports["openai"]
+
+
+@pytest.fixture(scope="session")
+def mock_ctranslate2(mock_heavy_imports):
+    """The mocked ctranslate2 module."""
+    return mock_heavy_imports["ctranslate2"]
+
+
+@pytest.fixture(scope="session")
+def mock_transcription_service():
+    """Create a fake TranscriptionService that doesn't require Whisper/LLM."""
+    return FakeTranscriptionService()
 
 
 # =============================================================================
@@ -86,57 +221,63 @@ def mock_whisper_model():
 # =============================================================================
 
 
-@pytest.fixture(scope="function")
-def app(db_session: Session, mock_transcription_service):
-    """Create a FastAPI app instance with test database and mocked services."""
-    # Mock the heavy imports before importing app
-    mock_whisper = MagicMock()
-    mock_openai = MagicMock()
-
-    with patch.dict(
-        "sys.modules",
-        {
-            "faster_whisper": mock_whisper,
-            "openai": mock_openai,
-        },
-    ):
-        # Force reimport to get fresh module with mocks
-        if "transcription" in sys.modules:
-            del sys.modules["transcription"]
-        if "app" in sys.modules:
-            del sys.modules["app"]
+@pytest.fixture(scope="session")
+def app(mock_transcription_service):
+    """Create the FastAPI app instance with mocked services for the session."""
+    # Imported under the session-wide heavy-module mocks (see pytest_configure)
+    import app as app_module
 
-        import app as app_module
+    # Patch the service at module level - this will be used by the lifespan
+    # We also need to patch TranscriptionService to prevent it from loading
+    with patch.object(app_module, "service", mock_transcription_service):
+        with patch.object(
+            app_module,
+            "TranscriptionService",
+            return_value=mock_transcription_service,
+        ):
+            yield app_module.app
 
-        # Override database dependency
-        def override_get_db():
-            try:
-                yield db_session
-            finally:
-                pass
+    # Cleanup
+    app_module.app.dependency_overrides.clear()
 
-        app_module.app.dependency_overrides[get_db] = override_get_db
 
-        # Patch the service at module level - this will be used by the lifespan
-        # We also need to patch TranscriptionService to prevent it from loading
-        with patch.object(app_module, "service", mock_transcription_service):
-            with patch.object(
-                app_module,
-                "TranscriptionService",
-                return_value=mock_transcription_service,
-            ):
-                yield app_module.app
+@pytest.fixture(scope="session")
+def session_client(app) -> Generator:
+    """Single TestClient (and lifespan run) shared by the whole session."""
+    from fastapi.testclient import TestClient
 
-        # Cleanup
-        app_module.app.dependency_overrides.clear()
+    with TestClient(app) as test_client:
+        yield test_client
 
 
 @pytest.fixture(scope="function")
-def client(app) -> Generator:
-    """Create a test client for making HTTP requests."""
-    from fastapi.testclient import TestClient
+def override_db(app, db_session: Session) -> Generator:
+    """Route the app's get_db dependency to this test's database session."""
 
-    with TestClient(app) as test_client:
+    def override_get_db():
+        yield db_session
+
+    app.dependency_overrides[get_db] = override_get_db
+    # Rate limits would otherwise accumulate across the shared app
+    app.state.limiter.reset()
+    yield
+    app.dependency_overrides.pop(get_db, None)
+
+
+@pytest.fixture(scope="function")
+def client(session_client, override_db):
+    """Test client bound to this test's database session."""
+    return session_client
+
+
+@pytest.fixture(scope="function")
+async def async_client(app, override_db) -> AsyncGenerator:
+    """Async client for tests that issue many concurrent requests."""
+    import httpx
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as test_client:
         yield test_client
 
 
@@ -170,13 +311,35 @@ def sample_transcript(db_session: Session):
 
 
 @pytest.fixture
-def sample_transcript_with_messages(db_session: Session, sample_transcript):
-    """Create a transcript with chat messages."""
-    from database import add_message
+def sample_transcript_with_messages(db_session: Session):
+    """Create a transcript with chat messages in a single commit."""
+    from datetime import timedelta
 
-    add_message(db_session, sample_transcript.id, "user", "What is this about?")
-    add_message(db_session, sample_transcript.id, "assistant", "This is about testing.")
-    return sample_transcript
+    from database import ChatMessage, Transcript, generate_id, utc_now
+
+    now = utc_now()
+    transcript = Transcript(
+        id=generate_id(),
+        title="Sample Transcript",
+        raw_text="Raw text content here.",
+        cleaned_text="Cleaned text content here.",
+        created_at=now,
+    )
+    messages = [
+        ChatMessage(
+            transcript=transcript,
+            role=role,
+            content=content,
+            created_at=now + timedelta(seconds=i),
+        )
+        for i, (role, content) in enumerate(
+            [("user", "What is this about?"), ("assistant", "This is about testing.")],
+            start=1,
+        )
+    ]
+    db_session.add_all([transcript, *messages])
+    db_session.commit()
+    return transcript
 
 
 # =============================================================================
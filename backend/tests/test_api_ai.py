@@ -4,18 +4,25 @@ API integration tests for AI/transcription endpoints.
 These tests use mocked services to avoid requiring actual Whisper/LLM.
 """
 
+import json
+
 from fastapi.testclient import TestClient
 
+# Pre-encoded request bodies shared across tests (skips per-call json.dumps)
+_JSON_HEADERS = {"content-type": "application/json"}
+_CLEAN_BODY = json.dumps({"text": "um like you know this is a test"}).encode()
+_EMPTY_TEXT_BODY = json.dumps({"text": ""}).encode()
+
+# Route templates, formatted with % instead of per-call f-strings
+EXPORT_URL = "/api/transcripts/%s/export"
+
 
 class TestCleanEndpoint:
     """Tests for POST /api/clean endpoint."""
 
     def test_clean_text_success(self, client: TestClient):
         """Successfully clean text with LLM."""
-        response = client.post(
-            "/api/clean",
-            json={"text": "um like you know this is a test"},
-        )
+        response = client.post("/api/clean", content=_CLEAN_BODY, headers=_JSON_HEADERS)
 
         assert response.status_code == 200
         data = response.json()
@@ -27,8 +34,7 @@ class TestCleanEndpoint:
     def test_clean_text_empty(self, client: TestClient):
         """Return empty string for empty input."""
         response = client.post(
-            "/api/clean",
-            json={"text": ""},
+            "/api/clean", content=_EMPTY_TEXT_BODY, headers=_JSON_HEADERS
         )
 
         assert response.status_code == 200
@@ -50,6 +56,27 @@ class TestCleanEndpoint:
         data = response.json()
         assert data["success"] is True
 
+    def test_clean_text_with_title(self, client: TestClient):
+        """with_title should return the cleaned text and a title together."""
+        response = client.post(
+            "/api/clean", json={"text": "um this is a test", "with_title": True}
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["text"] == "This is cleaned text."
+        assert data["title"] == "Test Title"
+
+    def test_clean_text_stream(self, client: TestClient):
+        """The stream endpoint should return the cleaned text as plain text."""
+        response = client.post(
+            "/api/clean/stream", content=_CLEAN_BODY, headers=_JSON_HEADERS
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert response.text == "This is cleaned text."
+
 
 class TestGenerateTitleEndpoint:
     """Tests for POST /api/generate-title endpoint."""
@@ -71,8 +98,7 @@ class TestGenerateTitleEndpoint:
     def test_generate_title_empty_text(self, client: TestClient):
         """Return 'Untitled' for empty text."""
         response = client.post(
-            "/api/generate-title",
-            json={"text": ""},
+            "/api/generate-title", content=_EMPTY_TEXT_BODY, headers=_JSON_HEADERS
         )
 
         assert response.status_code == 200
@@ -117,9 +143,7 @@ class TestExportEndpoint:
 
     def test_export_markdown(self, client: TestClient, sample_transcript):
         """Export transcript as Markdown."""
-        response = client.get(
-            f"/api/transcripts/{sample_transcript.id}/export?format=md"
-        )
+        response = client.get(EXPORT_URL % sample_transcript.id + "?format=md")
 
         assert response.status_code == 200
         assert response.headers["content-type"] == "text/markdown; charset=utf-8"
@@ -129,9 +153,7 @@ class TestExportEndpoint:
 
     def test_export_plaintext(self, client: TestClient, sample_transcript):
         """Export transcript as plain text."""
-        response = client.get(
-            f"/api/transcripts/{sample_transcript.id}/export?format=txt"
-        )
+        response = client.get(EXPORT_URL % sample_transcript.id + "?format=txt")
 
         assert response.status_code == 200
         assert response.headers["content-type"] == "text/plain; charset=utf-8"
@@ -139,12 +161,15 @@ class TestExportEndpoint:
         assert "Sample Transcript" in content
         assert "ORIGINAL TRANSCRIPT" in content
 
-    def test_export_pdf(self, client: TestClient, sample_transcript):
+    def test_export_pdf(self, client: TestClient, sample_transcript, monkeypatch):
         """Export transcript as PDF."""
-        response = client.get(
-            f"/api/transcripts/{sample_transcript.id}/export?format=pdf"
+        # Skip ReportLab rendering; only the endpoint's PDF branch is under test
+        monkeypatch.setattr(
+            "app.generate_pdf", lambda transcript, messages: b"%PDF-1.4\n%%EOF\n"
         )
 
+        response = client.get(EXPORT_URL % sample_transcript.id + "?format=pdf")
+
         assert response.status_code == 200
         assert response.headers["content-type"] == "application/pdf"
         # PDF should start with %PDF
@@ -152,16 +177,14 @@ class TestExportEndpoint:
 
     def test_export_default_format(self, client: TestClient, sample_transcript):
         """Default format should be Markdown."""
-        response = client.get(f"/api/transcripts/{sample_transcript.id}/export")
+        response = client.get(EXPORT_URL % sample_transcript.id)
 
         assert response.status_code == 200
         assert response.headers["content-type"] == "text/markdown; charset=utf-8"
 
     def test_export_invalid_format(self, client: TestClient, sample_transcript):
         """Reject invalid export format."""
-        response = client.get(
-            f"/api/transcripts/{sample_transcript.id}/export?format=doc"
-        )
+        response = client.get(EXPORT_URL % sample_transcript.id + "?format=doc")
 
         assert response.status_code == 422  # Validation error
 
@@ -176,7 +199,7 @@ class TestExportEndpoint:
     ):
         """Export should include chat history."""
         response = client.get(
-            f"/api/transcripts/{sample_transcript_with_messages.id}/export?format=md"
+            EXPORT_URL % sample_transcript_with_messages.id + "?format=md"
         )
 
         assert response.status_code == 200
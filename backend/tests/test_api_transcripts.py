@@ -2,8 +2,14 @@
 API integration tests for transcript endpoints.
 """
 
+import asyncio
+
+import httpx
 from fastapi.testclient import TestClient
 
+# Route template, formatted with % instead of per-call f-strings
+MESSAGES_URL = "/api/transcripts/%s/messages"
+
 
 class TestStatusEndpoints:
     """Tests for status and system endpoints."""
@@ -63,6 +69,23 @@ class TestTranscriptListEndpoint:
         data = response.json()
         assert len(data["transcripts"]) == 5
 
+    async def test_list_transcripts_after_concurrent_creates(
+        self, async_client: httpx.AsyncClient
+    ):
+        """List all transcripts created by concurrent requests."""
+        responses = await asyncio.gather(
+            *[
+                async_client.post("/api/transcripts", json={"title": f"T{i}"})
+                for i in range(50)
+            ]
+        )
+        assert all(r.status_code == 201 for r in responses)
+
+        response = await async_client.get("/api/transcripts")
+
+        assert response.status_code == 200
+        assert len(response.json()["transcripts"]) == 50
+
 
 class TestTranscriptSearchEndpoint:
     """Tests for GET /api/transcripts/search endpoint."""
@@ -242,17 +265,21 @@ class TestTranscriptUpdateEndpoint:
 class TestTranscriptDeleteEndpoint:
     """Tests for DELETE /api/transcripts/{id} endpoint."""
 
-    def test_delete_transcript_success(self, client: TestClient, sample_transcript):
+    def test_delete_transcript_success(
+        self, client: TestClient, db_session, sample_transcript
+    ):
         """Successfully delete a transcript."""
-        response = client.delete(f"/api/transcripts/{sample_transcript.id}")
+        from database import get_transcript_by_id
+
+        transcript_id = sample_transcript.id
+        response = client.delete(f"/api/transcripts/{transcript_id}")
 
         assert response.status_code == 200
         data = response.json()
         assert data["success"] is True
 
-        # Verify it's gone
-        get_response = client.get(f"/api/transcripts/{sample_transcript.id}")
-        assert get_response.status_code == 404
+        # Verify it's gone (the endpoint shares db_session via get_db override)
+        assert get_transcript_by_id(db_session, transcript_id) is None
 
     def test_delete_transcript_not_found(self, client: TestClient):
         """Return 404 for non-existent transcript."""
@@ -266,7 +293,7 @@ class TestMessageEndpoints:
 
     def test_get_messages_empty(self, client: TestClient, sample_transcript):
         """Return empty list when no messages exist."""
-        response = client.get(f"/api/transcripts/{sample_transcript.id}/messages")
+        response = client.get(MESSAGES_URL % sample_transcript.id)
 
         assert response.status_code == 200
         data = response.json()
@@ -276,9 +303,7 @@ class TestMessageEndpoints:
         self, client: TestClient, sample_transcript_with_messages
     ):
         """Return messages when they exist."""
-        response = client.get(
-            f"/api/transcripts/{sample_transcript_with_messages.id}/messages"
-        )
+        response = client.get(MESSAGES_URL % sample_transcript_with_messages.id)
 
         assert response.status_code == 200
         data = response.json()
@@ -295,7 +320,7 @@ class TestMessageEndpoints:
     def test_add_message_user(self, client: TestClient, sample_transcript):
         """Add a user message."""
         response = client.post(
-            f"/api/transcripts/{sample_transcript.id}/messages",
+            MESSAGES_URL % sample_transcript.id,
             json={"role": "user", "content": "Hello!"},
         )
 
@@ -308,7 +333,7 @@ class TestMessageEndpoints:
     def test_add_message_assistant(self, client: TestClient, sample_transcript):
         """Add an assistant message."""
         response = client.post(
-            f"/api/transcripts/{sample_transcript.id}/messages",
+            MESSAGES_URL % sample_transcript.id,
             json={"role": "assistant", "content": "Hi there!"},
         )
 
@@ -319,7 +344,7 @@ class TestMessageEndpoints:
     def test_add_message_invalid_role(self, client: TestClient, sample_transcript):
         """Reject invalid role."""
         response = client.post(
-            f"/api/transcripts/{sample_transcript.id}/messages",
+            MESSAGES_URL % sample_transcript.id,
             json={"role": "invalid", "content": "Test"},
         )
 
@@ -2,19 +2,18 @@
 Unit tests for database.py - CRUD operations and models.
 """
 
+from datetime import UTC, datetime, timedelta
+
 from sqlalchemy.orm import Session
 
 from database import (
-    Setting,
     add_message,
     create_transcript,
     delete_transcript,
     generate_id,
     get_all_transcripts,
     get_messages_for_transcript,
-    get_setting,
     get_transcript_by_id,
-    set_setting,
     update_transcript,
     utc_now,
 )
@@ -35,13 +34,10 @@ class TestHelperFunctions:
 
     def test_generate_id_unique(self):
         """generate_id should return unique values."""
-        ids = [generate_id() for _ in range(100)]
-        assert len(set(ids)) == 100  # All unique
+        assert len({generate_id() for _ in range(1000)}) == 1000  # All unique
 
     def test_utc_now_returns_datetime(self):
         """utc_now should return a datetime object."""
-        from datetime import datetime
-
         now = utc_now()
         assert isinstance(now, datetime)
 
@@ -97,8 +93,17 @@ class TestTranscriptCRUD:
         transcripts = get_all_transcripts(db_session)
         assert transcripts == []
 
-    def test_get_all_transcripts_ordered_by_date(self, db_session: Session):
+    def test_get_all_transcripts_ordered_by_date(
+        self, db_session: Session, monkeypatch
+    ):
         """Transcripts should be ordered by created_at descending."""
+        # Deterministic, strictly increasing clock instead of wall time
+        counter = iter(range(1000))
+        base = datetime(2024, 1, 1, tzinfo=UTC)
+        monkeypatch.setattr(
+            "database.utc_now", lambda: base + timedelta(seconds=next(counter))
+        )
+
         create_transcript(db_session, title="First")
         create_transcript(db_session, title="Second")
         create_transcript(db_session, title="Third")
@@ -241,9 +246,24 @@ class TestChatMessageCRUD:
         self, db_session: Session, sample_transcript
     ):
         """Messages should be ordered by created_at ascending."""
-        add_message(db_session, sample_transcript.id, "user", "First")
-        add_message(db_session, sample_transcript.id, "assistant", "Second")
-        add_message(db_session, sample_transcript.id, "user", "Third")
+        from database import ChatMessage
+
+        # Seed in one commit with explicit, strictly increasing timestamps
+        now = utc_now()
+        db_session.add_all(
+            [
+                ChatMessage(
+                    transcript_id=sample_transcript.id,
+                    role=role,
+                    content=content,
+                    created_at=now + timedelta(microseconds=i),
+                )
+                for i, (role, content) in enumerate(
+                    [("user", "First"), ("assistant", "Second"), ("user", "Third")]
+                )
+            ]
+        )
+        db_session.commit()
 
         messages = get_messages_for_transcript(db_session, sample_transcript.id)
 
@@ -276,6 +296,8 @@ class TestSettingsCRUD:
 
     def test_set_setting_new(self, db_session: Session):
         """Create a new setting."""
+        from database import get_setting, set_setting
+
         set_setting(db_session, "test_key", "test_value")
 
         value = get_setting(db_session, "test_key")
@@ -283,6 +305,8 @@ class TestSettingsCRUD:
 
     def test_set_setting_update(self, db_session: Session):
         """Update an existing setting."""
+        from database import get_setting, set_setting
+
         set_setting(db_session, "update_key", "original")
         set_setting(db_session, "update_key", "updated")
 
@@ -291,11 +315,15 @@ class TestSettingsCRUD:
 
     def test_get_setting_not_found(self, db_session: Session):
         """Return None for non-existent setting."""
+        from database import get_setting
+
         value = get_setting(db_session, "nonexistent_key")
         assert value is None
 
     def test_setting_model_attributes(self, db_session: Session):
         """Setting model should have key and value attributes."""
+        from database import Setting, set_setting
+
         set_setting(db_session, "dict_key", "dict_value")
 
         setting = db_session.query(Setting).filter(Setting.key == "dict_key").first()
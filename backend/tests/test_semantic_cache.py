@@ -0,0 +1,87 @@
+"""
+Unit tests for semantic_cache.py - embedding-similarity response cache.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from semantic_cache import SemanticCache
+
+# Tiny fake embedding space: texts about the budget vs. the release
+VECTORS = {
+    "the budget was approved": [1.0, 0.0, 0.0],
+    "the budget got approved": [0.98, 0.2, 0.0],
+    "the release slipped a week": [0.0, 0.0, 1.0],
+}
+
+
+def fake_embed(text: str) -> list[float]:
+    return VECTORS[text]
+
+
+class TestSemanticCache:
+    """Tests for SemanticCache lookups, eviction and persistence."""
+
+    def test_similar_input_hits(self):
+        """A close paraphrase should return the cached response."""
+        cache = SemanticCache(fake_embed, threshold=0.95)
+        cache.put("The budget was approved", "Budget Approval")
+
+        assert cache.get("the budget got approved") == "Budget Approval"
+
+    def test_dissimilar_input_misses(self):
+        """Unrelated input should not return a cached response."""
+        cache = SemanticCache(fake_embed, threshold=0.95)
+        cache.put("the budget was approved", "Budget Approval")
+
+        assert cache.get("the release slipped a week") is None
+
+    def test_exact_only_cache_ignores_similar_input(self, tmp_path):
+        """With threshold=None only the same normalized text should hit."""
+
+        def no_embed(text: str) -> list[float]:
+            raise AssertionError("exact-only caches must not embed")
+
+        path = tmp_path / "cache.npz"
+        cache = SemanticCache(no_embed, threshold=None, path=path)
+        cache.put("The budget was  approved", "Cleaned.")
+
+        assert cache.get("the budget was approved") == "Cleaned."
+        assert cache.get("the budget got approved") is None
+        cache.save()
+        reloaded = SemanticCache(no_embed, threshold=None, path=path)
+        assert reloaded.get("the budget was approved") == "Cleaned."
+
+    def test_evicts_least_recently_used(self):
+        """Entries beyond max_entries should evict the least recently used."""
+        cache = SemanticCache(fake_embed, threshold=0.95, max_entries=2)
+        cache.put("the budget was approved", "Budget")
+        cache.put("the release slipped a week", "Release")
+        cache.get("the budget was approved")
+        cache.put("the budget got approved", "Budget Again")
+
+        assert len(cache) == 2
+        assert cache.get("the release slipped a week") is None
+
+    def test_save_and_reload(self, tmp_path):
+        """A saved cache should be reloaded from the same path."""
+        path = tmp_path / "cache.npz"
+        cache = SemanticCache(fake_embed, threshold=0.95, path=path)
+        cache.put("the budget was approved", "Budget Approval")
+        cache.save()
+
+        reloaded = SemanticCache(fake_embed, threshold=0.95, path=path)
+        assert reloaded.get("the budget got approved") == "Budget Approval"
+
+    def test_concurrent_puts_and_gets(self):
+        """Threads sharing a cache should never see it mid-update."""
+        cache = SemanticCache(lambda text: [1.0, float(len(text))], threshold=0.95)
+
+        def worker(i: int) -> None:
+            for j in range(200):
+                cache.put(f"text {i} {j}", "response")
+                cache.get(f"text {j}")
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(worker, range(4)))
+
+        assert len(cache) == 800
@@ -4,62 +4,51 @@ Unit tests for transcription.py - Whisper and LLM service.
 These tests use mocks to avoid requiring actual Whisper models or LLM connections.
 """
 
-import sys
-from unittest.mock import MagicMock, patch
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-# =============================================================================
-# Module-level mocking setup
-# =============================================================================
-
-# Mock the heavy dependencies before importing transcription
-mock_faster_whisper = MagicMock()
-mock_openai = MagicMock()
-
-# Create mock classes
-mock_whisper_model = MagicMock()
-mock_openai_client = MagicMock()
+# faster_whisper and openai are mocked for the whole session in conftest.py;
+# these fixtures wire per-test instances into the shared mock modules.
 
-mock_faster_whisper.WhisperModel = mock_whisper_model
-mock_openai.OpenAI = mock_openai_client
 
+def streamed(text: str):
+    """A streamed chat completion (stream=True) whose deltas join to text."""
+    return iter([MagicMock(choices=[MagicMock(delta=MagicMock(content=text))])])
 
-@pytest.fixture(autouse=True)
-def mock_heavy_imports():
-    """Mock heavy imports for all tests."""
-    with patch.dict(
-        sys.modules,
-        {
-            "faster_whisper": mock_faster_whisper,
-            "openai": mock_openai,
-        },
-    ):
-        # Force reimport of transcription module with mocks
-        if "transcription" in sys.modules:
-            del sys.modules["transcription"]
 
-        yield
+async def astreamed(text: str):
+    """Async streamed chat completion whose deltas join to text."""
+    yield MagicMock(choices=[MagicMock(delta=MagicMock(content=text))])
 
 
 @pytest.fixture
-def mock_whisper_instance():
+def mock_whisper_instance(mock_faster_whisper):
     """Create a mock WhisperModel instance."""
+    from transcription import _get_whisper
+
+    # Models are cached per process; each test needs its own mock
+    _get_whisper.cache_clear()
     mock = MagicMock()
     mock.transcribe.return_value = (
         [MagicMock(text="Transcribed text.")],
         MagicMock(language="en"),
     )
+    mock_faster_whisper.WhisperModel.return_value = mock
     return mock
 
 
 @pytest.fixture
-def mock_openai_instance():
+def mock_openai_instance(mock_openai):
     """Create a mock OpenAI client instance."""
     mock = MagicMock()
     mock.chat.completions.create.return_value = MagicMock(
         choices=[MagicMock(message=MagicMock(content="Test response"))]
     )
+    mock_openai.OpenAI.return_value = mock
     return mock
 
 
@@ -71,11 +60,9 @@ def mock_openai_instance():
 class TestLLMProvider:
     """Tests for LLMProvider class."""
 
-    def test_init_creates_client(self, mock_openai_instance):
+    def test_init_creates_client(self, mock_openai, mock_openai_instance):
         """LLMProvider should initialize OpenAI client with correct params."""
-        mock_openai.OpenAI.return_value = mock_openai_instance
-
-        from transcription import LLMProvider
+        from transcription import LLM_TIMEOUT, SDK_MAX_RETRIES, LLMProvider
 
         provider = LLMProvider(
             base_url="http://localhost:11434/v1",
@@ -85,7 +72,11 @@ class TestLLMProvider:
         )
 
         mock_openai.OpenAI.assert_called_with(
-            base_url="http://localhost:11434/v1", api_key="test-key"
+            base_url="http://localhost:11434/v1",
+            api_key="test-key",
+            http_client=None,
+            timeout=LLM_TIMEOUT,
+            max_retries=SDK_MAX_RETRIES,
         )
         assert provider.name == "Test Provider"
         assert provider.model == "llama2"
@@ -93,8 +84,6 @@ class TestLLMProvider:
 
     def test_chat_calls_completions_create(self, mock_openai_instance):
         """chat() should call client.chat.completions.create with correct params."""
-        mock_openai.OpenAI.return_value = mock_openai_instance
-
         from transcription import LLMProvider
 
         provider = LLMProvider(
@@ -114,6 +103,44 @@ class TestLLMProvider:
             stream=True,
         )
 
+    def test_circuit_opens_after_failure(self, mock_openai, mock_openai_instance):
+        """A failing provider should be skipped until its backoff expires."""
+        from transcription import CircuitOpenError, LLMProvider
+
+        provider = LLMProvider(
+            base_url="http://localhost:11434/v1", api_key="test-key", model="llama2"
+        )
+        create = mock_openai_instance.chat.completions.create
+        create.side_effect = mock_openai.APIConnectionError("Connection refused")
+
+        with pytest.raises(Exception, match="Connection refused"):
+            provider.chat([{"role": "user", "content": "Hello"}])
+        with pytest.raises(CircuitOpenError):
+            provider.chat([{"role": "user", "content": "Hello"}])
+        assert create.call_count == 1
+
+        # Once the interval has passed, a successful probe closes the circuit
+        provider._open_until = 0.0
+        create.side_effect = None
+        provider.chat([{"role": "user", "content": "Hello"}])
+        assert provider._consecutive_failures == 0
+
+    def test_bad_request_does_not_open_circuit(self, mock_openai, mock_openai_instance):
+        """Client errors are the request's fault, not the provider's."""
+        from transcription import LLMProvider
+
+        provider = LLMProvider(
+            base_url="http://localhost:11434/v1", api_key="test-key", model="llama2"
+        )
+        create = mock_openai_instance.chat.completions.create
+        create.side_effect = mock_openai.BadRequestError("context length exceeded")
+
+        for _ in range(2):
+            with pytest.raises(mock_openai.BadRequestError):
+                provider.chat([{"role": "user", "content": "Hello"}])
+        assert create.call_count == 2
+        assert provider._consecutive_failures == 0
+
 
 # =============================================================================
 # TranscriptionService Tests
@@ -123,11 +150,10 @@ class TestLLMProvider:
 class TestTranscriptionServiceInit:
     """Tests for TranscriptionService initialization."""
 
-    def test_init_with_primary_only(self, mock_whisper_instance, mock_openai_instance):
+    def test_init_with_primary_only(
+        self, mock_faster_whisper, mock_whisper_instance, mock_openai_instance
+    ):
         """Initialize with only primary provider (no fallback)."""
-        mock_faster_whisper.WhisperModel.return_value = mock_whisper_instance
-        mock_openai.OpenAI.return_value = mock_openai_instance
-
         from transcription import TranscriptionService
 
         service = TranscriptionService(
@@ -137,18 +163,86 @@ class TestTranscriptionServiceInit:
             llm_model="llama2",
         )
 
+        assert service.whisper is mock_whisper_instance
         mock_faster_whisper.WhisperModel.assert_called_with(
-            "base.en", device="auto", compute_type="int8"
+            "base.en", device="cpu", compute_type="int8"
         )
         assert service.fallback_provider is None
 
-    def test_init_with_fallback(self, mock_whisper_instance, mock_openai_instance):
-        """Initialize with both primary and fallback providers."""
-        mock_faster_whisper.WhisperModel.return_value = mock_whisper_instance
-        mock_openai.OpenAI.return_value = mock_openai_instance
+    def test_failed_whisper_load_is_logged_and_retried(
+        self, mock_faster_whisper, mock_whisper_instance, mock_openai_instance, caplog
+    ):
+        """A failed background load should be logged, then retried on next use."""
+        from transcription import TranscriptionService
+
+        mock_faster_whisper.WhisperModel.side_effect = [
+            RuntimeError("download failed"),
+            mock_whisper_instance,
+        ]
+        service = TranscriptionService(
+            whisper_model="base.en",
+            llm_base_url="http://localhost:11434/v1",
+            llm_api_key="ollama",
+            llm_model="llama2",
+        )
+
+        with pytest.raises(RuntimeError, match="download failed"):
+            service._whisper_future.result()
+        assert isinstance(service.whisper_load_error(), RuntimeError)
+        assert service.whisper is mock_whisper_instance
+        assert service.whisper_load_error() is None
+        assert "failed to load: download failed" in caplog.text
+
+    def test_init_uses_int8_float16_on_cuda(
+        self,
+        mock_faster_whisper,
+        mock_ctranslate2,
+        mock_whisper_instance,
+        mock_openai_instance,
+        monkeypatch,
+    ):
+        """Auto compute_type should pick int8_float16 when a CUDA device is present."""
+        monkeypatch.setattr(mock_ctranslate2.get_cuda_device_count, "return_value", 1)
+
+        from transcription import TranscriptionService
+
+        service = TranscriptionService(
+            whisper_model="base.en",
+            llm_base_url="http://localhost:11434/v1",
+            llm_api_key="ollama",
+            llm_model="llama2",
+        )
 
+        assert service.whisper is mock_whisper_instance
+        mock_faster_whisper.WhisperModel.assert_called_with(
+            "base.en", device="cuda", compute_type="int8_float16"
+        )
+
+    def test_init_keeps_explicit_compute_type(
+        self, mock_faster_whisper, mock_whisper_instance, mock_openai_instance
+    ):
+        """An explicit compute_type should override the automatic choice."""
         from transcription import TranscriptionService
 
+        service = TranscriptionService(
+            whisper_model="base.en",
+            llm_base_url="http://localhost:11434/v1",
+            llm_api_key="ollama",
+            llm_model="llama2",
+            compute_type="float32",
+        )
+
+        assert service.whisper is mock_whisper_instance
+        mock_faster_whisper.WhisperModel.assert_called_with(
+            "base.en", device="cpu", compute_type="float32"
+        )
+
+    def test_init_with_fallback(
+        self, mock_openai, mock_whisper_instance, mock_openai_instance
+    ):
+        """Initialize with both primary and fallback providers."""
+        from transcription import SDK_MAX_RETRIES, TranscriptionService
+
         service = TranscriptionService(
             whisper_model="base.en",
             llm_base_url="http://localhost:11434/v1",
@@ -160,6 +254,92 @@ class TestTranscriptionServiceInit:
         )
 
         assert service.fallback_provider is not None
+        # Only the primary skips SDK retries; the fallback takes over instead
+        retries = [c.kwargs["max_retries"] for c in mock_openai.OpenAI.call_args_list]
+        assert retries == [0, SDK_MAX_RETRIES]
+
+    def test_primary_keeps_sdk_retries_without_fallback(
+        self, mock_openai, mock_whisper_instance, mock_openai_instance
+    ):
+        """With nothing to fall back to, transient errors should be retried."""
+        from transcription import SDK_MAX_RETRIES, TranscriptionService
+
+        TranscriptionService(
+            whisper_model="base.en",
+            llm_base_url="http://localhost:11434/v1",
+            llm_api_key="ollama",
+            llm_model="llama2",
+        )
+
+        assert mock_openai.OpenAI.call_args.kwargs["max_retries"] == SDK_MAX_RETRIES
+        assert mock_openai.AsyncOpenAI.call_args.kwargs["max_retries"] == (
+            SDK_MAX_RETRIES
+        )
+
+    def test_providers_share_http_client(
+        self, mock_openai, mock_whisper_instance, mock_openai_instance
+    ):
+        """Primary and fallback providers should reuse one pooled HTTP client."""
+        from transcription import TranscriptionService
+
+        service = TranscriptionService(
+            whisper_model="base.en",
+            llm_base_url="http://localhost:11434/v1",
+            llm_api_key="ollama",
+            llm_model="llama2",
+            fallback_base_url="https://api.openai.com/v1",
+            fallback_api_key="sk-xxx",
+            fallback_model="gpt-4o-mini",
+        )
+
+        http_clients = {
+            call.kwargs["http_client"]
+            for call in mock_openai.OpenAI.call_args_list[-2:]
+        }
+        assert http_clients == {service._http}
+
+        service.close()
+        assert service._http.is_closed
+
+    def test_services_share_whisper_model(
+        self, mock_faster_whisper, mock_whisper_instance, mock_openai_instance
+    ):
+        """Services with the same model settings should load Whisper once."""
+        from transcription import TranscriptionService
+
+        mock_faster_whisper.WhisperModel.reset_mock()
+        services = [
+            TranscriptionService(
+                whisper_model="base.en",
+                llm_base_url="http://localhost:11434/v1",
+                llm_api_key="ollama",
+                llm_model="llama2",
+            )
+            for _ in range(2)
+        ]
+
+        assert services[0].whisper is services[1].whisper
+        mock_faster_whisper.WhisperModel.assert_called_once()
+
+    def test_warmup_transcribes_silence(
+        self, mock_whisper_instance, mock_openai_instance
+    ):
+        """warmup() should run one dummy transcription and a 1-token LLM call."""
+        from transcription import TranscriptionService
+
+        service = TranscriptionService(
+            whisper_model="base.en",
+            llm_base_url="http://localhost:11434/v1",
+            llm_api_key="ollama",
+            llm_model="llama2",
+        )
+        service.warmup()
+
+        audio = mock_whisper_instance.transcribe.call_args[0][0]
+        assert audio.shape == (16000,)
+        assert not audio.any()
+        call_kwargs = mock_openai_instance.chat.completions.create.call_args[1]
+        assert call_kwargs["max_tokens"] == 1
 
 
 class TestTranscriptionServiceTranscribe:
@@ -173,8 +353,6 @@ class TestTranscriptionServiceTranscribe:
             MagicMock(text=" Thank you. "),
         ]
         mock_whisper_instance.transcribe.return_value = (mock_segments, MagicMock())
-        mock_faster_whisper.WhisperModel.return_value = mock_whisper_instance
-        mock_openai.OpenAI.return_value = mock_openai_instance
 
         from transcription import TranscriptionService
 
@@ -191,21 +369,19 @@ class TestTranscriptionServiceTranscribe:
         assert "Hello, this is" in result
         assert "a test transcription" in result
         assert "Thank you" in result
+        from transcription import WHISPER_DECODE_OPTIONS
+
         mock_whisper_instance.transcribe.assert_called_once_with(
-            "/path/to/audio.wav",
-            beam_size=5,
-            language="en",
-            condition_on_previous_text=False,
+            "/path/to/audio.wav", beam_size=1, **WHISPER_DECODE_OPTIONS
         )
+        assert WHISPER_DECODE_OPTIONS["vad_filter"] is True
+        assert WHISPER_DECODE_OPTIONS["word_timestamps"] is False
+        assert WHISPER_DECODE_OPTIONS["temperature"][0] == 0.0
 
-    def test_transcribe_empty_segments(
+    def test_transcribe_fast_uses_greedy_decoding(
         self, mock_whisper_instance, mock_openai_instance
     ):
-        """transcribe() should handle empty segments."""
-        mock_whisper_instance.transcribe.return_value = ([], MagicMock())
-        mock_faster_whisper.WhisperModel.return_value = mock_whisper_instance
-        mock_openai.OpenAI.return_value = mock_openai_instance
-
+        """transcribe_fast() should decode greedily with VAD filtering."""
         from transcription import TranscriptionService
 
         service = TranscriptionService(
@@ -215,19 +391,26 @@ class TestTranscriptionServiceTranscribe:
             llm_model="llama2",
         )
 
-        result = service.transcribe("/path/to/audio.wav")
-        assert result == ""
-
+        assert service.transcribe_fast("/path/to/audio.wav") == "Transcribed text."
+        kwargs = mock_whisper_instance.transcribe.call_args.kwargs
+        assert kwargs["beam_size"] == 1
+        assert kwargs["temperature"] == 0.0
+        assert kwargs["vad_filter"] is True
 
-class TestTranscriptionServiceClean:
-    """Tests for clean_with_llm() method."""
-
-    def test_clean_empty_text_returns_empty(
+    def test_transcribe_stream_yields_segments(
         self, mock_whisper_instance, mock_openai_instance
     ):
-        """clean_with_llm() should return empty string for empty input."""
-        mock_faster_whisper.WhisperModel.return_value = mock_whisper_instance
-        mock_openai.OpenAI.return_value = mock_openai_instance
+        """transcribe_stream() should yield each non-empty segment as decoded."""
+        mock_whisper_instance.transcribe.return_value = (
+            iter(
+                [
+                    MagicMock(text=" First part ."),
+                    MagicMock(text="  "),
+                    MagicMock(text=" Second."),
+                ]
+            ),
+            MagicMock(),
+        )
 
         from transcription import TranscriptionService
 
@@ -238,18 +421,15 @@ class TestTranscriptionServiceClean:
             llm_model="llama2",
         )
 
-        result = service.clean_with_llm("")
-        assert result == ""
+        stream = service.transcribe_stream("/path/to/audio.wav")
+        assert next(stream) == "First part."
+        assert list(stream) == ["Second."]
 
-    def test_clean_uses_primary_provider(
+    def test_transcribe_empty_segments(
         self, mock_whisper_instance, mock_openai_instance
     ):
-        """clean_with_llm() should use primary provider."""
-        mock_openai_instance.chat.completions.create.return_value = MagicMock(
-            choices=[MagicMock(message=MagicMock(content="Cleaned text"))]
-        )
-        mock_faster_whisper.WhisperModel.return_value = mock_whisper_instance
-        mock_openai.OpenAI.return_value = mock_openai_instance
+        """transcribe() should handle empty segments."""
+        mock_whisper_instance.transcribe.return_value = ([], MagicMock())
 
         from transcription import TranscriptionService
 
@@ -260,45 +440,41 @@ class TestTranscriptionServiceClean:
             llm_model="llama2",
         )
 
-        result = service.clean_with_llm("um like you know test")
-        assert result == "Cleaned text"
+        result = service.transcribe("/path/to/audio.wav")
+        assert result == ""
 
-    def test_clean_returns_raw_on_failure(
-        self, mock_whisper_instance, mock_openai_instance
+    def test_transcribe_caches_by_audio_content(
+        self, mock_whisper_instance, mock_openai_instance, temp_audio_file, tmp_path
     ):
-        """clean_with_llm() should return raw text if provider fails."""
-        mock_openai_instance.chat.completions.create.side_effect = Exception(
-            "LLM failed"
+        """transcribe() should reuse the cached text for identical audio."""
+        mock_whisper_instance.transcribe.return_value = (
+            [MagicMock(text=" Cached words.")],
+            MagicMock(),
         )
-        mock_faster_whisper.WhisperModel.return_value = mock_whisper_instance
-        mock_openai.OpenAI.return_value = mock_openai_instance
 
         from transcription import TranscriptionService
 
-        service = TranscriptionService(
-            whisper_model="base.en",
-            llm_base_url="http://localhost:11434/v1",
-            llm_api_key="ollama",
-            llm_model="llama2",
-        )
-
-        raw_text = "um like you know test"
-        result = service.clean_with_llm(raw_text)
+        with patch("config.TRANSCRIBE_CACHE_DIR", str(tmp_path / "cache")):
+            service = TranscriptionService(
+                whisper_model="base.en",
+                llm_base_url="http://localhost:11434/v1",
+                llm_api_key="ollama",
+                llm_model="llama2",
+            )
 
-        # Should return raw text as fallback
-        assert result == raw_text
+        first = service.transcribe(str(temp_audio_file))
+        second = service.transcribe(str(temp_audio_file))
 
+        assert first == second == "Cached words."
+        mock_whisper_instance.transcribe.assert_called_once()
+        assert len(list((tmp_path / "cache").glob("*.txt"))) == 1
 
-class TestTranscriptionServiceGenerateTitle:
-    """Tests for generate_title() method."""
 
-    def test_generate_title_empty_text(
-        self, mock_whisper_instance, mock_openai_instance
-    ):
-        """generate_title() should return 'Untitled' for empty text."""
-        mock_faster_whisper.WhisperModel.return_value = mock_whisper_instance
-        mock_openai.OpenAI.return_value = mock_openai_instance
+class TestFixWhisperSpacing:
+    """Tests for _fix_whisper_spacing()."""
 
+    def test_fixes_tokenizer_spacing(self, mock_whisper_instance, mock_openai_instance):
+        """Spaces around punctuation, quotes, hyphens and dots should be fixed."""
         from transcription import TranscriptionService
 
         service = TranscriptionService(
@@ -308,17 +484,15 @@ class TestTranscriptionServiceGenerateTitle:
             llm_model="llama2",
         )
 
-        result = service.generate_title("")
-        assert result == "Untitled"
-
-    def test_generate_title_success(self, mock_whisper_instance, mock_openai_instance):
-        """generate_title() should return LLM-generated title."""
-        mock_openai_instance.chat.completions.create.return_value = MagicMock(
-            choices=[MagicMock(message=MagicMock(content='"Meeting Notes"'))]
+        text = "We built a full -stack app , see ( config .py). Done !"
+        assert service._fix_whisper_spacing(text) == (
+            "We built a full-stack app, see (config.py). Done!"
         )
-        mock_faster_whisper.WhisperModel.return_value = mock_whisper_instance
-        mock_openai.OpenAI.return_value = mock_openai_instance
 
+    def test_matches_sequential_passes(
+        self, mock_whisper_instance, mock_openai_instance
+    ):
+        """The single-pass fix should behave like the former ordered passes."""
         from transcription import TranscriptionService
 
         service = TranscriptionService(
@@ -328,47 +502,46 @@ class TestTranscriptionServiceGenerateTitle:
             llm_model="llama2",
         )
 
-        result = service.generate_title("This is a meeting about project planning...")
-
-        # Quotes should be stripped
-        assert result == "Meeting Notes"
+        assert service._fix_whisper_spacing("I don 't know ( really)") == (
+            "I don't know (really)"
+        )
+        # Matches don't overlap, so only the first hyphen of a chain is joined
+        assert service._fix_whisper_spacing("a - b - c") == "a-b - c"
 
-    def test_generate_title_limits_words(
+    def test_clean_ascii_text_skips_regex(
         self, mock_whisper_instance, mock_openai_instance
     ):
-        """generate_title() should limit title to 5 words max."""
-        mock_openai_instance.chat.completions.create.return_value = MagicMock(
-            choices=[
-                MagicMock(message=MagicMock(content="This Is A Very Long Title Indeed"))
-            ]
-        )
-        mock_faster_whisper.WhisperModel.return_value = mock_whisper_instance
-        mock_openai.OpenAI.return_value = mock_openai_instance
-
-        from transcription import TranscriptionService
+        """ASCII text with nothing to fix should be returned without a regex pass."""
+        import transcription
 
-        service = TranscriptionService(
+        service = transcription.TranscriptionService(
             whisper_model="base.en",
             llm_base_url="http://localhost:11434/v1",
             llm_api_key="ollama",
             llm_model="llama2",
         )
 
-        result = service.generate_title("Some long transcript text...")
+        text = "It's a full-stack app, see config.py. Done!"
+        with patch.object(transcription, "SPACING_RE") as spacing_re:
+            assert service._fix_whisper_spacing(text) == text
+            spacing_re.sub.assert_not_called()
+            service._fix_whisper_spacing("Done !")
+            spacing_re.sub.assert_called_once()
 
-        # Should be limited to 5 words
-        assert len(result.split()) <= 5
-        assert result == "This Is A Very Long"
 
-    def test_generate_title_fallback_on_failure(
-        self, mock_whisper_instance, mock_openai_instance
+class TestTranscriptionServiceTranscribeMany:
+    """Tests for transcribe_many() method."""
+
+    def test_transcribe_many_uses_batched_pipeline(
+        self, mock_faster_whisper, mock_whisper_instance, mock_openai_instance
     ):
-        """generate_title() should use first 3 words if LLM fails."""
-        mock_openai_instance.chat.completions.create.side_effect = Exception(
-            "LLM failed"
-        )
-        mock_faster_whisper.WhisperModel.return_value = mock_whisper_instance
-        mock_openai.OpenAI.return_value = mock_openai_instance
+        """transcribe_many() should run each file through the batched pipeline."""
+        mock_batched = MagicMock()
+        mock_batched.transcribe.side_effect = [
+            ([MagicMock(text=" First file .")], MagicMock()),
+            ([MagicMock(text=" Second"), MagicMock(text="file.")], MagicMock()),
+        ]
+        mock_faster_whisper.BatchedInferencePipeline.return_value = mock_batched
 
         from transcription import TranscriptionService
 
@@ -379,22 +552,56 @@ class TestTranscriptionServiceGenerateTitle:
             llm_model="llama2",
         )
 
-        result = service.generate_title("Hello world this is a test")
+        result = service.transcribe_many(["/a.wav", "/b.wav"], batch_size=8)
 
-        # Should return first 3 words as fallback
-        assert result == "Hello world this"
+        assert result == ["First file.", "Second file."]
+        mock_faster_whisper.BatchedInferencePipeline.assert_called_with(
+            model=mock_whisper_instance
+        )
+        assert mock_batched.transcribe.call_count == 2
+        assert mock_batched.transcribe.call_args[1]["batch_size"] == 8
 
+    def test_transcribe_many_uses_worker_pool(
+        self, mock_faster_whisper, mock_whisper_instance, mock_openai_instance
+    ):
+        """With WHISPER_CPU_WORKERS set, files should go to the process pool."""
+        mock_batched = MagicMock()
+        mock_faster_whisper.BatchedInferencePipeline.return_value = mock_batched
+
+        import transcription
+
+        with (
+            patch("config.WHISPER_CPU_WORKERS", 2),
+            patch.object(transcription, "ProcessPoolExecutor") as mock_executor_cls,
+        ):
+            mock_executor_cls.return_value.map.return_value = iter(
+                ["First file .", "Second file ."]
+            )
+            service = transcription.TranscriptionService(
+                whisper_model="base.en",
+                llm_base_url="http://localhost:11434/v1",
+                llm_api_key="ollama",
+                llm_model="llama2",
+            )
+            result = service.transcribe_many(["/a.wav", "/b.wav"])
+            service.close()
+
+        assert result == ["First file.", "Second file."]
+        assert mock_executor_cls.call_args.kwargs["max_workers"] == 2
+        assert mock_executor_cls.call_args.kwargs["initargs"] == ("base.en", "int8")
+        mp_context = mock_executor_cls.call_args.kwargs["mp_context"]
+        assert mp_context.get_start_method() == "spawn"
+        mock_batched.transcribe.assert_not_called()
+        mock_executor_cls.return_value.shutdown.assert_called_once()
 
-class TestTranscriptionServiceChat:
-    """Tests for chat() method."""
 
-    def test_chat_basic(self, mock_whisper_instance, mock_openai_instance):
-        """chat() should send message and return response."""
-        mock_response = MagicMock()
-        mock_openai_instance.chat.completions.create.return_value = mock_response
-        mock_faster_whisper.WhisperModel.return_value = mock_whisper_instance
-        mock_openai.OpenAI.return_value = mock_openai_instance
+class TestTranscriptionServiceClean:
+    """Tests for clean_with_llm() method."""
 
+    def test_clean_empty_text_returns_empty(
+        self, mock_whisper_instance, mock_openai_instance
+    ):
+        """clean_with_llm() should return empty string for empty input."""
         from transcription import TranscriptionService
 
         service = TranscriptionService(
@@ -404,15 +611,16 @@ class TestTranscriptionServiceChat:
             llm_model="llama2",
         )
 
-        result = service.chat("Hello!")
-
-        assert result == mock_response
-        mock_openai_instance.chat.completions.create.assert_called_once()
+        result = service.clean_with_llm("")
+        assert result == ""
 
-    def test_chat_with_context(self, mock_whisper_instance, mock_openai_instance):
-        """chat() should include context in system prompt."""
-        mock_faster_whisper.WhisperModel.return_value = mock_whisper_instance
-        mock_openai.OpenAI.return_value = mock_openai_instance
+    def test_clean_uses_primary_provider(
+        self, mock_whisper_instance, mock_openai_instance
+    ):
+        """clean_with_llm() should use primary provider."""
+        mock_openai_instance.chat.completions.create.return_value = streamed(
+            "Cleaned text"
+        )
 
         from transcription import TranscriptionService
 
@@ -423,37 +631,41 @@ class TestTranscriptionServiceChat:
             llm_model="llama2",
         )
 
-        service.chat("What is this about?", context="Meeting about project X")
-
-        call_args = mock_openai_instance.chat.completions.create.call_args
-        messages = call_args[1]["messages"]
-        assert "Meeting about project X" in messages[0]["content"]
+        result = service.clean_with_llm(
+            "um like you know this is a test of the cleaning step"
+        )
+        assert result == "Cleaned text"
+        call_kwargs = mock_openai_instance.chat.completions.create.call_args[1]
+        assert call_kwargs["stream"] is True
 
-    def test_chat_streaming(self, mock_whisper_instance, mock_openai_instance):
-        """chat() should pass stream parameter correctly."""
-        mock_faster_whisper.WhisperModel.return_value = mock_whisper_instance
-        mock_openai.OpenAI.return_value = mock_openai_instance
+    def test_clean_without_streaming(self, mock_whisper_instance, mock_openai_instance):
+        """With LLM_STREAM_CLEAN off, the reply should be read in one piece."""
+        mock_openai_instance.chat.completions.create.return_value = MagicMock(
+            choices=[MagicMock(message=MagicMock(content="Cleaned text"))]
+        )
 
-        from transcription import TranscriptionService
+        import transcription
 
-        service = TranscriptionService(
+        service = transcription.TranscriptionService(
             whisper_model="base.en",
             llm_base_url="http://localhost:11434/v1",
             llm_api_key="ollama",
             llm_model="llama2",
         )
 
-        service.chat("Hello!", stream=True)
-
-        call_args = mock_openai_instance.chat.completions.create.call_args
-        assert call_args[1]["stream"] is True
+        text = "um like you know this is a test of the cleaning step"
+        with patch.object(transcription.config, "LLM_STREAM_CLEAN", False):
+            result = service.clean_with_llm(text)
 
-    def test_chat_raises_on_failure(self, mock_whisper_instance, mock_openai_instance):
-        """chat() should raise RuntimeError if provider fails."""
-        mock_openai_instance.chat.completions.create.side_effect = Exception("Failed")
-        mock_faster_whisper.WhisperModel.return_value = mock_whisper_instance
-        mock_openai.OpenAI.return_value = mock_openai_instance
+        assert result == "Cleaned text"
+        call_kwargs = mock_openai_instance.chat.completions.create.call_args[1]
+        assert call_kwargs["stream"] is False
+        assert call_kwargs["max_tokens"] == transcription._clean_max_tokens(text)
 
+    def test_clean_skips_llm_for_short_text(
+        self, mock_whisper_instance, mock_openai_instance
+    ):
+        """Short text should be returned without an LLM call."""
         from transcription import TranscriptionService
 
         service = TranscriptionService(
@@ -462,22 +674,22 @@ class TestTranscriptionServiceChat:
             llm_api_key="ollama",
             llm_model="llama2",
         )
+        default_prompt = service.get_default_system_prompt()
 
-        with pytest.raises(RuntimeError, match="No LLM providers available"):
-            service.chat("Hello!")
-
+        assert service.clean_with_llm("um short") == "um short"
+        # The UI sends the default prompt back verbatim; it isn't a custom one
+        assert service.clean_with_llm("um short", default_prompt) == "um short"
+        mock_openai_instance.chat.completions.create.assert_not_called()
 
-class TestSystemPrompt:
-    """Tests for system prompt loading."""
-
-    def test_get_default_system_prompt(
+    def test_clean_does_not_skip_filler_free_text(
         self, mock_whisper_instance, mock_openai_instance
     ):
-        """get_default_system_prompt() should return the loaded prompt."""
-        mock_faster_whisper.WhisperModel.return_value = mock_whisper_instance
-        mock_openai.OpenAI.return_value = mock_openai_instance
+        """Grammar and punctuation fixes apply even without filler words."""
+        mock_openai_instance.chat.completions.create.return_value = streamed(
+            "The quarterly report was approved by the board today."
+        )
 
-        from transcription import SYSTEM_PROMPT, TranscriptionService
+        from transcription import TranscriptionService
 
         service = TranscriptionService(
             whisper_model="base.en",
@@ -486,7 +698,1010 @@ class TestSystemPrompt:
             llm_model="llama2",
         )
 
-        result = service.get_default_system_prompt()
-        assert result == SYSTEM_PROMPT
-        assert isinstance(result, str)
-        assert len(result) > 0
+        result = service.clean_with_llm(
+            "the quarterly report was approved by the bored today"
+        )
+
+        assert result == "The quarterly report was approved by the board today."
+        mock_openai_instance.chat.completions.create.assert_called_once()
+
+    def test_clean_returns_raw_on_failure(
+        self, mock_whisper_instance, mock_openai_instance
+    ):
+        """clean_with_llm() should return raw text if provider fails."""
+        mock_openai_instance.chat.completions.create.side_effect = Exception(
+            "LLM failed"
+        )
+
+        from transcription import TranscriptionService
+
+        service = TranscriptionService(
+            whisper_model="base.en",
+            llm_base_url="http://localhost:11434/v1",
+            llm_api_key="ollama",
+            llm_model="llama2",
+        )
+
+        raw_text = "um like you know this is a test of the cleaning step"
+        result = service.clean_with_llm(raw_text)
+
+        # Should return raw text as fallback
+        assert result == raw_text
+
+    def test_clean_falls_back_to_local_model(
+        self, mock_whisper_instance, mock_openai_instance
+    ):
+        """clean_with_llm() should try the local model once providers fail."""
+        mock_openai_instance.chat.completions.create.side_effect = Exception(
+            "LLM failed"
+        )
+        mock_llama_cpp = MagicMock()
+        mock_llama_cpp.Llama.return_value.create_chat_completion.return_value = {
+            "choices": [{"message": {"content": " Locally cleaned. "}}]
+        }
+
+        from transcription import TranscriptionService
+
+        with patch.dict("sys.modules", {"llama_cpp": mock_llama_cpp}):
+            service = TranscriptionService(
+                whisper_model="base.en",
+                llm_base_url="http://localhost:11434/v1",
+                llm_api_key="ollama",
+                llm_model="llama2",
+                tiny_model_path="/models/tiny.gguf",
+            )
+
+        result = service.clean_with_llm(BATCH_TEXTS[0])
+
+        assert result == "Locally cleaned."
+        assert mock_llama_cpp.Llama.call_args.kwargs["model_path"] == (
+            "/models/tiny.gguf"
+        )
+
+    def test_clean_cache_applies_to_default_prompt_sent_verbatim(
+        self, mock_whisper_instance, mock_openai_instance
+    ):
+        """The UI always sends the default prompt; its results are still cached."""
+        mock_openai_instance.chat.completions.create.side_effect = (
+            lambda **kwargs: streamed("Cleaned text.")
+        )
+
+        from transcription import TranscriptionService
+
+        with (
+            patch("config.SEMANTIC_CACHE", True),
+            patch("config.TRANSCRIBE_CACHE_DIR", ""),
+        ):
+            service = TranscriptionService(
+                whisper_model="base.en",
+                llm_base_url="http://localhost:11434/v1",
+                llm_api_key="ollama",
+                llm_model="llama2",
+            )
+        default_prompt = service.get_default_system_prompt()
+
+        first = service.clean_with_llm(BATCH_TEXTS[0], default_prompt)
+        second = service.clean_with_llm(BATCH_TEXTS[0], default_prompt)
+        custom = service.clean_with_llm(BATCH_TEXTS[0], "Translate to French.")
+
+        assert first == second == custom == "Cleaned text."
+        assert mock_openai_instance.chat.completions.create.call_count == 2
+
+    def test_local_model_calls_do_not_overlap(
+        self, mock_whisper_instance, mock_openai_instance
+    ):
+        """Concurrent requests should take turns on the shared local model."""
+        mock_openai_instance.chat.completions.create.side_effect = Exception(
+            "LLM failed"
+        )
+        active, overlaps = [], []
+
+        def create_chat_completion(**kwargs):
+            active.append(1)
+            overlaps.append(len(active) > 1)
+            time.sleep(0.01)
+            active.pop()
+            return {"choices": [{"message": {"content": "Locally cleaned."}}]}
+
+        mock_llama_cpp = MagicMock()
+        mock_llama_cpp.Llama.return_value.create_chat_completion = (
+            create_chat_completion
+        )
+
+        from transcription import TranscriptionService
+
+        with patch.dict("sys.modules", {"llama_cpp": mock_llama_cpp}):
+            service = TranscriptionService(
+                whisper_model="base.en",
+                llm_base_url="http://localhost:11434/v1",
+                llm_api_key="ollama",
+                llm_model="llama2",
+                tiny_model_path="/models/tiny.gguf",
+            )
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(service.clean_with_llm, BATCH_TEXTS * 2))
+
+        assert results == ["Locally cleaned."] * 4
+        assert overlaps == [False] * 4
+
+
+class TestChunkByTokens:
+    """Tests for _chunk_by_tokens() used to clean long transcripts."""
+
+    def test_chunks_break_after_sentences(self):
+        """Chunks should respect the token budget and end on sentence breaks."""
+        from transcription import _chunk_by_tokens, _count_tokens
+
+        sentences = [f"Sentence number {i} is about the budget." for i in range(40)]
+        text = " ".join(sentences)
+
+        chunks = _chunk_by_tokens(text, 50)
+
+        assert len(chunks) > 1
+        assert " ".join(chunks) == text
+        assert all(chunk.endswith(".") for chunk in chunks)
+        assert all(_count_tokens(chunk) <= 50 for chunk in chunks)
+
+    def test_clean_long_text_cleans_chunks_separately(
+        self, mock_whisper_instance, mock_openai_instance
+    ):
+        """clean_with_llm() should send each chunk of a long text separately."""
+        mock_openai_instance.chat.completions.create.side_effect = (
+            lambda **kwargs: streamed("Cleaned chunk.")
+        )
+
+        import transcription
+
+        service = transcription.TranscriptionService(
+            whisper_model="base.en",
+            llm_base_url="http://localhost:11434/v1",
+            llm_api_key="ollama",
+            llm_model="llama2",
+        )
+
+        text = " ".join(f"Um so sentence {i} is here." for i in range(30))
+        with (
+            patch.object(transcription, "CLEAN_CHUNK_THRESHOLD_TOKENS", 50),
+            patch.object(transcription, "CLEAN_CHUNK_TOKENS", 40),
+        ):
+            result = service.clean_with_llm(text)
+
+        calls = mock_openai_instance.chat.completions.create.call_count
+        assert calls > 1
+        assert result == "\n\n".join(["Cleaned chunk."] * calls)
+
+    async def test_parallel_chunks_take_turns_on_local_model(
+        self, mock_openai, mock_whisper_instance, mock_openai_instance
+    ):
+        """Chunks cleaned in parallel must not call the local model concurrently."""
+        mock_openai_instance.chat.completions.create.side_effect = Exception("down")
+        mock_async_client = MagicMock()
+        mock_async_client.chat.completions.create = AsyncMock(
+            side_effect=Exception("down")
+        )
+        mock_openai.AsyncOpenAI.return_value = mock_async_client
+        active, overlaps = [], []
+
+        def create_chat_completion(**kwargs):
+            active.append(1)
+            overlaps.append(len(active) > 1)
+            time.sleep(0.005)
+            active.pop()
+            return {"choices": [{"message": {"content": "Cleaned chunk."}}]}
+
+        mock_llama_cpp = MagicMock()
+        mock_llama_cpp.Llama.return_value.create_chat_completion = (
+            create_chat_completion
+        )
+
+        import transcription
+
+        with patch.dict("sys.modules", {"llama_cpp": mock_llama_cpp}):
+            service = transcription.TranscriptionService(
+                whisper_model="base.en",
+                llm_base_url="http://localhost:11434/v1",
+                llm_api_key="ollama",
+                llm_model="llama2",
+                tiny_model_path="/models/tiny.gguf",
+            )
+
+        text = " ".join(f"Um so sentence {i} is here." for i in range(30))
+        with (
+            patch.object(transcription, "CLEAN_CHUNK_THRESHOLD_TOKENS", 50),
+            patch.object(transcription, "CLEAN_CHUNK_TOKENS", 40),
+        ):
+            # Sync (thread pool) and async (gather + to_thread) paths at once
+            results = await asyncio.gather(
+                asyncio.to_thread(service.clean_with_llm, text),
+                service.aclean_with_llm(text),
+            )
+
+        assert len(overlaps) > 2
+        assert not any(overlaps)
+        assert results[0] == results[1]
+
+
+class TestTranscriptionServiceCleanStream:
+    """Tests for clean_with_llm_stream() method."""
+
+    def test_clean_stream_yields_deltas(
+        self, mock_whisper_instance, mock_openai_instance
+    ):
+        """clean_with_llm_stream() should yield content deltas in order."""
+        mock_openai_instance.chat.completions.create.return_value = iter(
+            [
+                MagicMock(choices=[MagicMock(delta=MagicMock(content="Cleaned "))]),
+                MagicMock(choices=[MagicMock(delta=MagicMock(content=None))]),
+                MagicMock(choices=[MagicMock(delta=MagicMock(content="text"))]),
+            ]
+        )
+
+        from transcription import TranscriptionService
+
+        service = TranscriptionService(
+            whisper_model="base.en",
+            llm_base_url="http://localhost:11434/v1",
+            llm_api_key="ollama",
+            llm_model="llama2",
+        )
+
+        chunks = list(
+            service.clean_with_llm_stream(
+                "um like you know this is a test of the cleaning step"
+            )
+        )
+
+        assert chunks == ["Cleaned ", "text"]
+        assert mock_openai_instance.chat.completions.create.call_args[1]["stream"]
+
+    def test_clean_stream_yields_raw_on_failure(
+        self, mock_whisper_instance, mock_openai_instance
+    ):
+        """clean_with_llm_stream() should yield the raw text if providers fail."""
+        mock_openai_instance.chat.completions.create.side_effect = Exception("down")
+
+        from transcription import TranscriptionService
+
+        service = TranscriptionService(
+            whisper_model="base.en",
+            llm_base_url="http://localhost:11434/v1",
+            llm_api_key="ollama",
+            llm_model="llama2",
+        )
+
+        raw_text = "um like you know this is a test of the cleaning step"
+        assert list(service.clean_with_llm_stream(raw_text)) == [raw_text]
+
+
+BATCH_TEXTS = [
+    "um so the first clip is about the release schedule",
+    "uh and the second clip, you know, covers the budget",
+]
+
+
+class TestTranscriptionServiceCleanBatch:
+    """Tests for clean_batch_with_llm() method."""
+
+    def test_clean_batch_single_request(
+        self, mock_whisper_instance, mock_openai_instance
+    ):
+        """clean_batch_with_llm() should clean all texts in one LLM call."""
+        mock_openai_instance.chat.completions.create.return_value = MagicMock(
+            choices=[MagicMock(message=MagicMock(content='["One.", "Two."]'))]
+        )
+
+        import transcription
+
+        service = transcription.TranscriptionService(
+            whisper_model="base.en",
+            llm_base_url="http://localhost:11434/v1",
+            llm_api_key="ollama",
+            llm_model="llama2",
+        )
+
+        result = service.clean_batch_with_llm(BATCH_TEXTS)
+
+        assert result == ["One.", "Two."]
+        mock_openai_instance.chat.completions.create.assert_called_once()
+        call_kwargs = mock_openai_instance.chat.completions.create.call_args[1]
+        assert call_kwargs["max_tokens"] == sum(
+            transcription._clean_max_tokens(text) for text in BATCH_TEXTS
+        )
+        messages = call_kwargs["messages"]
+        assert f"### 1\n{BATCH_TEXTS[0]}" in messages[1]["content"]
+        assert f"### 2\n{BATCH_TEXTS[1]}" in messages[1]["content"]
+
+    def test_clean_batch_falls_back_on_bad_json(
+        self, mock_whisper_instance, mock_openai_instance
+    ):
+        """Unparseable batch output should fall back to per-text cleaning."""
+        mock_openai_instance.chat.completions.create.side_effect = [
+            MagicMock(choices=[MagicMock(message=MagicMock(content="not json"))]),
+            streamed("One."),
+            streamed("Two."),
+        ]
+
+        from transcription import TranscriptionService
+
+        service = TranscriptionService(
+            whisper_model="base.en",
+            llm_base_url="http://localhost:11434/v1",
+            llm_api_key="ollama",
+            llm_model="llama2",
+        )
+
+        assert service.clean_batch_with_llm(BATCH_TEXTS) == ["One.", "Two."]
+
+
+class TestTranscriptionServiceCleanAndTitle:
+    """Tests for clean_and_title() method."""
+
+    def test_clean_and_title_single_request(
+        self, mock_whisper_instance, mock_openai_instance
+    ):
+        """clean_and_title() should get both outputs from one JSON response."""
+        mock_openai_instance.chat.completions.create.return_value = MagicMock(
+            choices=[
+                MagicMock(
+                    message=MagicMock(
+                        content='{"cleaned": "We met today.", "title": "Team Meeting."}'
+                    )
+                )
+            ]
+        )
+
+        from transcription import TranscriptionService
+
+        service = TranscriptionService(
+            whisper_model="base.en",
+            llm_base_url="http://localhost:11434/v1",
+            llm_api_key="ollama",
+            llm_model="llama2",
+        )
+
+        result = service.clean_and_title(BATCH_TEXTS[0])
+
+        assert result == ("We met today.", "Team Meeting")
+        mock_openai_instance.chat.completions.create.assert_called_once()
+        call_kwargs = mock_openai_instance.chat.completions.create.call_args[1]
+        assert call_kwargs["response_format"] == {"type": "json_object"}
+
+    def test_clean_and_title_long_text_skips_fused_request(
+        self, mock_whisper_instance, mock_openai_instance
+    ):
+        """Texts over the chunk threshold should be cleaned in chunks, then titled."""
+        mock_openai_instance.chat.completions.create.side_effect = [
+            streamed("The team met today to plan."),
+            MagicMock(choices=[MagicMock(message=MagicMock(content="Team Meeting"))]),
+        ]
+
+        import transcription
+
+        service = transcription.TranscriptionService(
+            whisper_model="base.en",
+            llm_base_url="http://localhost:11434/v1",
+            llm_api_key="ollama",
+            llm_model="llama2",
+        )
+
+        with patch.object(transcription, "CLEAN_CHUNK_THRESHOLD_TOKENS", 5):
+            result = service.clean_and_title(BATCH_TEXTS[0])
+
+        assert result == ("The team met today to plan.", "Team Meeting")
+        for call in mock_openai_instance.chat.completions.create.call_args_list:
+            assert "response_format" not in call.kwargs
+
+    def test_clean_and_title_falls_back_on_bad_json(
+        self, mock_whisper_instance, mock_openai_instance
+    ):
+        """Unparseable output should fall back to separate clean and title calls."""
+        mock_openai_instance.chat.completions.create.side_effect = [
+            MagicMock(choices=[MagicMock(message=MagicMock(content="not json"))]),
+            streamed("The team met today."),
+            MagicMock(choices=[MagicMock(message=MagicMock(content="Team Meeting"))]),
+        ]
+
+        from transcription import TranscriptionService
+
+        service = TranscriptionService(
+            whisper_model="base.en",
+            llm_base_url="http://localhost:11434/v1",
+            llm_api_key="ollama",
+            llm_model="llama2",
+        )
+
+        result = service.clean_and_title(BATCH_TEXTS[0])
+
+        assert result == ("The team met today.", "Team Meeting")
+        assert mock_openai_instance.chat.completions.create.call_count == 3
+
+    async def test_aclean_and_title_uses_async_client(
+        self, mock_openai, mock_whisper_instance, mock_openai_instance
+    ):
+        """aclean_and_title() should send the fused request on the async client."""
+        mock_async_client = MagicMock()
+        mock_async_client.chat.completions.create = AsyncMock(
+            return_value=MagicMock(
+                choices=[
+                    MagicMock(
+                        message=MagicMock(
+                            content='{"cleaned": "We met today.", "title": "Team Meeting."}'
+                        )
+                    )
+                ]
+            )
+        )
+        mock_openai.AsyncOpenAI.return_value = mock_async_client
+
+        from transcription import TranscriptionService
+
+        service = TranscriptionService(
+            whisper_model="base.en",
+            llm_base_url="http://localhost:11434/v1",
+            llm_api_key="ollama",
+            llm_model="llama2",
+        )
+
+        result = await service.aclean_and_title(BATCH_TEXTS[0])
+
+        assert result == ("We met today.", "Team Meeting")
+        call_kwargs = mock_async_client.chat.completions.create.call_args[1]
+        assert call_kwargs["response_format"] == {"type": "json_object"}
+        mock_openai_instance.chat.completions.create.assert_not_called()
+
+
+class TestTranscriptionServicePipeline:
+    """Tests for transcribe_file_async() method."""
+
+    async def test_transcribe_file_async_cleans_chunks(
+        self, mock_openai, mock_whisper_instance, mock_openai_instance
+    ):
+        """transcribe_file_async() should return raw and LLM-cleaned text."""
+        mock_whisper_instance.transcribe.return_value = (
+            [MagicMock(text=" um hello there ."), MagicMock(text="bye")],
+            MagicMock(),
+        )
+        mock_async_client = MagicMock()
+        mock_async_client.chat.completions.create = AsyncMock(
+            return_value=astreamed("Hello there. Bye")
+        )
+        mock_openai.AsyncOpenAI.return_value = mock_async_client
+
+        from transcription import TranscriptionService
+
+        service = TranscriptionService(
+            whisper_model="base.en",
+            llm_base_url="http://localhost:11434/v1",
+            llm_api_key="ollama",
+            llm_model="llama2",
+        )
+
+        raw, cleaned = await service.transcribe_file_async("/path/to/audio.wav")
+
+        assert raw == "um hello there. bye"
+        assert cleaned == "Hello there. Bye"
+        mock_async_client.chat.completions.create.assert_awaited_once()
+
+
+class TestHedgedCall:
+    """Tests for hedged_call() and the async provider methods."""
+
+    async def test_slow_primary_is_raced_by_fallback(self):
+        """A primary slower than delay_ms should lose to the fallback."""
+        import asyncio
+
+        from transcription import hedged_call
+
+        primary_cancelled = asyncio.Event()
+
+        async def call(provider: str, first_token) -> str:
+            if provider == "primary":
+                try:
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    primary_cancelled.set()
+                    raise
+            return provider
+
+        result = await hedged_call(["primary", "fallback"], call, delay_ms=10)
+
+        assert result == "fallback"
+        await asyncio.wait_for(primary_cancelled.wait(), timeout=1)
+
+    async def test_failed_primary_starts_fallback_immediately(self):
+        """A failing primary should not wait out the hedge delay."""
+        import asyncio
+
+        from transcription import hedged_call
+
+        async def call(provider: str, first_token) -> str:
+            if provider == "primary":
+                raise RuntimeError("down")
+            return provider
+
+        result = await asyncio.wait_for(
+            hedged_call(["primary", "fallback"], call, delay_ms=60_000), timeout=1
+        )
+        assert result == "fallback"
+
+    async def test_streaming_primary_is_not_hedged(self):
+        """A primary that started streaming before delay_ms should be left to finish."""
+        import asyncio
+
+        from transcription import hedged_call
+
+        started = []
+
+        async def call(provider: str, first_token) -> str:
+            started.append(provider)
+            if provider == "primary":
+                first_token.set()
+                await asyncio.sleep(0.05)
+            return provider
+
+        result = await hedged_call(["primary", "fallback"], call, delay_ms=10)
+
+        assert result == "primary"
+        assert started == ["primary"]
+
+    async def test_all_providers_failing_raises_last_error(self):
+        """hedged_call() should raise when no provider succeeds."""
+        from transcription import hedged_call
+
+        async def call(provider: str, first_token) -> str:
+            raise RuntimeError(f"{provider} down")
+
+        with pytest.raises(RuntimeError, match="fallback down"):
+            await hedged_call(["primary", "fallback"], call, delay_ms=10)
+
+    async def test_agenerate_title_uses_async_client(
+        self, mock_openai, mock_whisper_instance, mock_openai_instance
+    ):
+        """agenerate_title() should call the async client and tidy the title."""
+        mock_async_client = MagicMock()
+        mock_async_client.chat.completions.create = AsyncMock(
+            return_value=MagicMock(
+                choices=[MagicMock(message=MagicMock(content='"Budget Review."'))]
+            )
+        )
+        mock_openai.AsyncOpenAI.return_value = mock_async_client
+
+        from transcription import TranscriptionService
+
+        service = TranscriptionService(
+            whisper_model="base.en",
+            llm_base_url="http://localhost:11434/v1",
+            llm_api_key="ollama",
+            llm_model="llama2",
+        )
+
+        result = await service.agenerate_title("We reviewed the budget for next year")
+
+        assert result == "Budget Review"
+        mock_async_client.chat.completions.create.assert_awaited_once()
+        mock_openai_instance.chat.completions.create.assert_not_called()
+
+
+class TestTranscriptionServiceGenerateTitle:
+    """Tests for generate_title() method."""
+
+    def test_generate_title_empty_text(
+        self, mock_whisper_instance, mock_openai_instance
+    ):
+        """generate_title() should return 'Untitled' for empty text."""
+        from transcription import TranscriptionService
+
+        service = TranscriptionService(
+            whisper_model="base.en",
+            llm_base_url="http://localhost:11434/v1",
+            llm_api_key="ollama",
+            llm_model="llama2",
+        )
+
+        result = service.generate_title("")
+        assert result == "Untitled"
+
+    def test_generate_title_short_text_skips_llm(
+        self, mock_whisper_instance, mock_openai_instance
+    ):
+        """generate_title() should use very short text as its own title."""
+        from transcription import TranscriptionService
+
+        service = TranscriptionService(
+            whisper_model="base.en",
+            llm_base_url="http://localhost:11434/v1",
+            llm_api_key="ollama",
+            llm_model="llama2",
+        )
+
+        assert service.generate_title("  Quick  note ") == "Quick note"
+        mock_openai_instance.chat.completions.create.assert_not_called()
+
+    def test_generate_title_success(self, mock_whisper_instance, mock_openai_instance):
+        """generate_title() should return LLM-generated title."""
+        mock_openai_instance.chat.completions.create.return_value = MagicMock(
+            choices=[MagicMock(message=MagicMock(content='"Meeting Notes"'))]
+        )
+
+        from transcription import TranscriptionService
+
+        service = TranscriptionService(
+            whisper_model="base.en",
+            llm_base_url="http://localhost:11434/v1",
+            llm_api_key="ollama",
+            llm_model="llama2",
+        )
+
+        result = service.generate_title("This is a meeting about project planning...")
+
+        # Quotes should be stripped
+        assert result == "Meeting Notes"
+
+    def test_generate_title_strips_trailing_punctuation(
+        self, mock_whisper_instance, mock_openai_instance
+    ):
+        """generate_title() should keep the first line without trailing punctuation."""
+        mock_openai_instance.chat.completions.create.return_value = MagicMock(
+            choices=[
+                MagicMock(
+                    message=MagicMock(content=' "Project Kickoff."\nBecause it is.')
+                )
+            ]
+        )
+
+        from transcription import TranscriptionService
+
+        service = TranscriptionService(
+            whisper_model="base.en",
+            llm_base_url="http://localhost:11434/v1",
+            llm_api_key="ollama",
+            llm_model="llama2",
+        )
+
+        result = service.generate_title("We kicked off the project today...")
+
+        assert result == "Project Kickoff"
+
+    def test_generate_title_limits_words(
+        self, mock_whisper_instance, mock_openai_instance
+    ):
+        """generate_title() should limit title to 5 words max."""
+        mock_openai_instance.chat.completions.create.return_value = MagicMock(
+            choices=[
+                MagicMock(message=MagicMock(content="This Is A Very Long Title Indeed"))
+            ]
+        )
+
+        from transcription import TranscriptionService
+
+        service = TranscriptionService(
+            whisper_model="base.en",
+            llm_base_url="http://localhost:11434/v1",
+            llm_api_key="ollama",
+            llm_model="llama2",
+        )
+
+        result = service.generate_title("Some long transcript text...")
+
+        # Should be limited to 5 words
+        assert len(result.split()) <= 5
+        assert result == "This Is A Very Long"
+
+    def test_generate_title_snippet_is_token_limited(
+        self, mock_whisper_instance, mock_openai_instance, monkeypatch
+    ):
+        """The title prompt should carry at most TITLE_SNIPPET_TOKENS tokens."""
+        import transcription
+
+        # Whitespace "tokenizer" standing in for tiktoken
+        fake_encoding = MagicMock(
+            encode=lambda text: text.split(), decode=lambda tokens: " ".join(tokens)
+        )
+        monkeypatch.setattr(transcription, "_get_tokenizer", lambda: fake_encoding)
+        monkeypatch.setattr(transcription, "TITLE_SNIPPET_TOKENS", 4)
+
+        service = transcription.TranscriptionService(
+            whisper_model="base.en",
+            llm_base_url="http://localhost:11434/v1",
+            llm_api_key="ollama",
+            llm_model="llama2",
+        )
+
+        service.generate_title("one two three four five six seven")
+
+        messages = mock_openai_instance.chat.completions.create.call_args[1]["messages"]
+        assert messages[0]["content"].endswith("Transcript:\none two three four")
+
+    def test_generate_title_reuses_title_for_same_text(
+        self, mock_whisper_instance, mock_openai_instance
+    ):
+        """Titling the same transcript again should not call the LLM again."""
+        mock_openai_instance.chat.completions.create.return_value = MagicMock(
+            choices=[MagicMock(message=MagicMock(content="Budget Review"))]
+        )
+
+        from transcription import TranscriptionService
+
+        service = TranscriptionService(
+            whisper_model="base.en",
+            llm_base_url="http://localhost:11434/v1",
+            llm_api_key="ollama",
+            llm_model="llama2",
+        )
+
+        text = "We reviewed the budget for next year"
+        assert service.generate_title(text) == "Budget Review"
+        assert service.generate_title(text) == "Budget Review"
+        mock_openai_instance.chat.completions.create.assert_called_once()
+
+    def test_generate_title_uses_semantic_cache(
+        self, mock_whisper_instance, mock_openai_instance
+    ):
+        """A near-identical transcript should reuse the cached title."""
+        mock_openai_instance.chat.completions.create.return_value = MagicMock(
+            choices=[MagicMock(message=MagicMock(content="Budget Review"))]
+        )
+
+        from transcription import TranscriptionService
+
+        with (
+            patch("config.SEMANTIC_CACHE", True),
+            patch("config.TRANSCRIBE_CACHE_DIR", ""),
+            patch.object(TranscriptionService, "_embed", return_value=[1.0, 0.0]),
+        ):
+            service = TranscriptionService(
+                whisper_model="base.en",
+                llm_base_url="http://localhost:11434/v1",
+                llm_api_key="ollama",
+                llm_model="llama2",
+            )
+            first = service.generate_title("We reviewed the budget for next year")
+            second = service.generate_title("We reviewed the budget for next year.")
+
+        assert first == second == "Budget Review"
+        mock_openai_instance.chat.completions.create.assert_called_once()
+
+    def test_generate_title_fallback_on_failure(
+        self, mock_whisper_instance, mock_openai_instance
+    ):
+        """generate_title() should use first 3 words if LLM fails."""
+        mock_openai_instance.chat.completions.create.side_effect = Exception(
+            "LLM failed"
+        )
+
+        from transcription import TranscriptionService
+
+        service = TranscriptionService(
+            whisper_model="base.en",
+            llm_base_url="http://localhost:11434/v1",
+            llm_api_key="ollama",
+            llm_model="llama2",
+        )
+
+        result = service.generate_title("Hello world this is a test")
+
+        # Should return first 3 words as fallback
+        assert result == "Hello world this"
+
+
+class TestTranscriptionServiceGenerateTitles:
+    """Tests for generate_titles() method."""
+
+    def test_generate_titles_uses_one_request(
+        self, mock_whisper_instance, mock_openai_instance
+    ):
+        """Titles should come from one numbered reply, skipping short texts."""
+        mock_openai_instance.chat.completions.create.return_value = MagicMock(
+            choices=[
+                MagicMock(
+                    message=MagicMock(content="1. Release Schedule\n2) Budget Plan.")
+                )
+            ]
+        )
+
+        from transcription import TranscriptionService
+
+        service = TranscriptionService(
+            whisper_model="base.en",
+            llm_base_url="http://localhost:11434/v1",
+            llm_api_key="ollama",
+            llm_model="llama2",
+        )
+
+        titles = service.generate_titles([BATCH_TEXTS[0], "Quick note", BATCH_TEXTS[1]])
+
+        assert titles == ["Release Schedule", "Quick note", "Budget Plan"]
+        mock_openai_instance.chat.completions.create.assert_called_once()
+        prompt = mock_openai_instance.chat.completions.create.call_args[1]["messages"][
+            0
+        ]["content"]
+        assert f"1. {BATCH_TEXTS[0]}\n2. {BATCH_TEXTS[1]}" in prompt
+
+    def test_generate_titles_splits_large_batches(
+        self, mock_whisper_instance, mock_openai_instance
+    ):
+        """More than TITLE_BATCH_MAX texts should be split across requests."""
+        mock_openai_instance.chat.completions.create.return_value = MagicMock(
+            choices=[
+                MagicMock(
+                    message=MagicMock(
+                        content="\n".join(f"{i}. Topic {i}" for i in range(1, 21))
+                    )
+                )
+            ]
+        )
+
+        from transcription import TranscriptionService
+
+        service = TranscriptionService(
+            whisper_model="base.en",
+            llm_base_url="http://localhost:11434/v1",
+            llm_api_key="ollama",
+            llm_model="llama2",
+        )
+
+        texts = [f"Clip number {i} about the quarterly plan" for i in range(25)]
+        titles = service.generate_titles(texts)
+
+        assert mock_openai_instance.chat.completions.create.call_count == 2
+        assert titles[:2] == ["Topic 1", "Topic 2"]
+        assert titles[20] == "Topic 1"
+
+
+class TestTranscriptionServiceChat:
+    """Tests for chat() method."""
+
+    def test_chat_basic(self, mock_whisper_instance, mock_openai_instance):
+        """chat() should send message and return response."""
+        mock_response = MagicMock()
+        mock_openai_instance.chat.completions.create.return_value = mock_response
+
+        from transcription import TranscriptionService
+
+        service = TranscriptionService(
+            whisper_model="base.en",
+            llm_base_url="http://localhost:11434/v1",
+            llm_api_key="ollama",
+            llm_model="llama2",
+        )
+
+        result = service.chat("Hello!")
+
+        assert result == mock_response
+        mock_openai_instance.chat.completions.create.assert_called_once()
+
+    def test_chat_with_context(self, mock_whisper_instance, mock_openai_instance):
+        """chat() should include context in system prompt."""
+        from transcription import TranscriptionService
+
+        service = TranscriptionService(
+            whisper_model="base.en",
+            llm_base_url="http://localhost:11434/v1",
+            llm_api_key="ollama",
+            llm_model="llama2",
+        )
+
+        service.chat("What is this about?", context="Meeting about project X")
+
+        call_args = mock_openai_instance.chat.completions.create.call_args
+        messages = call_args[1]["messages"]
+        # Static preamble first, then the context in its own system message
+        from transcription import CHAT_SYSTEM_PROMPT
+
+        assert messages[0] == {"role": "system", "content": CHAT_SYSTEM_PROMPT}
+        assert "Meeting about project X" in messages[1]["content"]
+
+    def test_chat_marks_static_prompt_for_caching(
+        self, mock_whisper_instance, mock_openai_instance
+    ):
+        """With LLM_CACHE_CONTROL on, the static prompt carries cache_control."""
+        from transcription import TranscriptionService
+
+        service = TranscriptionService(
+            whisper_model="base.en",
+            llm_base_url="http://localhost:11434/v1",
+            llm_api_key="ollama",
+            llm_model="llama2",
+        )
+
+        with patch("config.LLM_CACHE_CONTROL", True):
+            service.chat("What is this about?", context="Meeting about project X")
+
+        messages = mock_openai_instance.chat.completions.create.call_args[1]["messages"]
+        assert messages[0]["content"][0]["cache_control"] == {"type": "ephemeral"}
+        assert isinstance(messages[1]["content"], str)
+        assert not any("_cacheable" in msg for msg in messages)
+
+    def test_chat_history_trimmed_to_token_budget(
+        self, mock_whisper_instance, mock_openai_instance
+    ):
+        """Only the newest history messages that fit the token budget are sent."""
+        from transcription import TranscriptionService
+
+        service = TranscriptionService(
+            whisper_model="base.en",
+            llm_base_url="http://localhost:11434/v1",
+            llm_api_key="ollama",
+            llm_model="llama2",
+        )
+        history = [
+            {"role": "user", "content": "word " * 500},
+            {"role": "assistant", "content": "Short answer."},
+            {"role": "user", "content": "Short follow-up."},
+        ]
+
+        with patch("config.CHAT_HISTORY_TOKENS", 100):
+            service.chat("Hello!", chat_history=history)
+
+        messages = mock_openai_instance.chat.completions.create.call_args[1]["messages"]
+        assert [m["content"] for m in messages[2:]] == [
+            "Short answer.",
+            "Short follow-up.",
+            "Hello!",
+        ]
+
+    def test_chat_streaming(self, mock_whisper_instance, mock_openai_instance):
+        """chat() should pass stream parameter correctly."""
+        from transcription import TranscriptionService
+
+        service = TranscriptionService(
+            whisper_model="base.en",
+            llm_base_url="http://localhost:11434/v1",
+            llm_api_key="ollama",
+            llm_model="llama2",
+        )
+
+        service.chat("Hello!", stream=True)
+
+        call_args = mock_openai_instance.chat.completions.create.call_args
+        assert call_args[1]["stream"] is True
+
+    def test_chat_raises_on_failure(self, mock_whisper_instance, mock_openai_instance):
+        """chat() should raise RuntimeError if provider fails."""
+        mock_openai_instance.chat.completions.create.side_effect = Exception("Failed")
+
+        from transcription import TranscriptionService
+
+        service = TranscriptionService(
+            whisper_model="base.en",
+            llm_base_url="http://localhost:11434/v1",
+            llm_api_key="ollama",
+            llm_model="llama2",
+        )
+
+        with pytest.raises(RuntimeError, match="No LLM providers available"):
+            service.chat("Hello!")
+
+
+class TestSystemPrompt:
+    """Tests for system prompt loading."""
+
+    def test_get_default_system_prompt(
+        self, mock_whisper_instance, mock_openai_instance
+    ):
+        """get_default_system_prompt() should return the loaded prompt."""
+        from transcription import SYSTEM_PROMPT, TranscriptionService
+
+        service = TranscriptionService(
+            whisper_model="base.en",
+            llm_base_url="http://localhost:11434/v1",
+            llm_api_key="ollama",
+            llm_model="llama2",
+        )
+
+        result = service.get_default_system_prompt()
+        assert result == SYSTEM_PROMPT
+        assert isinstance(result, str)
+        assert len(result) > 0
+
+    def test_missing_prompt_file_returns_empty(self, tmp_path, monkeypatch):
+        """A missing system_prompt.txt should not break import or lookups."""
+        import transcription
+
+        monkeypatch.setattr(transcription, "PROMPT_FILE", tmp_path / "missing.txt")
+        transcription._load_system_prompt.cache_clear()
+        try:
+            assert transcription.SYSTEM_PROMPT == ""
+        finally:
+            transcription._load_system_prompt.cache_clear()
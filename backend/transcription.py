@@ -6,47 +6,582 @@ Configuration is loaded from .env file.
 Supports optional fallback provider for reliability.
 """
 
+import asyncio
+import functools
+import hashlib
+import importlib.util
 import logging
+import multiprocessing
+import os
 import re
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterator, Sequence
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 
-from faster_whisper import WhisperModel
-from openai import OpenAI
+import httpx
+import numpy as np
+from faster_whisper import BatchedInferencePipeline, WhisperModel
+from openai import (
+    APIConnectionError,
+    APITimeoutError,
+    AsyncOpenAI,
+    InternalServerError,
+    OpenAI,
+    RateLimitError,
+)
 
 import config
+from embeddings import EmbeddingService
+from semantic_cache import SemanticCache
+
+# orjson parses LLM JSON replies faster when installed; stdlib json otherwise
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
 
 logger = logging.getLogger(__name__)
 
 # Edit system_prompt.txt to change how the LLM cleans transcriptions
 PROMPT_FILE = Path(__file__).parent / "system_prompt.txt"
-SYSTEM_PROMPT = PROMPT_FILE.read_text().strip()
+
+# Log transcription progress every N Whisper segments (DEBUG level)
+SEGMENT_LOG_INTERVAL = 50
+
+# Approximate size of the text chunks handed from Whisper to the LLM cleaner
+# in the pipelined transcribe_file_async()
+PIPELINE_CHUNK_CHARS = 500
+
+# Texts longer than this (tokens) are cleaned as parallel ~CLEAN_CHUNK_TOKENS
+# chunks, keeping each LLM prefill short
+CLEAN_CHUNK_THRESHOLD_TOKENS = 2000
+CLEAN_CHUNK_TOKENS = 1500
+
+# Token budget for the transcript snippet sent with title requests
+TITLE_SNIPPET_TOKENS = 128
+
+# Generated titles remembered per service for exact-repeat requests
+RECENT_TITLES_MAX = 1024
+
+# LLM request timeout; a short connect timeout fails over quickly when a
+# provider is down
+LLM_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+
+# Whisper decoding: beam_size (WHISPER_BEAM_SIZE, greedy by default) is passed
+# per call. A window is re-decoded at the next temperature only when its output
+# looks degenerate (compression ratio / avg log-prob checks); VAD skips silent
+# stretches entirely
+WHISPER_DECODE_OPTIONS = {
+    "language": "en",
+    "best_of": 1,
+    "temperature": (0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+    "compression_ratio_threshold": 2.4,
+    "log_prob_threshold": -1.0,
+    "no_speech_threshold": 0.6,
+    "condition_on_previous_text": False,
+    # Only segment text is used; per-word alignment costs time and memory
+    "word_timestamps": False,
+    "vad_filter": True,
+    "vad_parameters": {"min_silence_duration_ms": 500},
+}
+
+# Max in-flight async requests per provider, to respect rate limits
+PROVIDER_CONCURRENCY = 5
+
+# Whisper compute types per device, best first (see select_whisper_precision)
+COMPUTE_TYPE_PREFERENCES = {
+    "cuda": ("int8_float16", "float16", "float32"),
+    "cpu": ("int8", "int8_float32", "float32"),
+}
+
+# Whisper tokenizer spacing fixes, one alternative per issue so the text is
+# scanned once: space before punctuation, around quotes, after "(", and
+# around hyphens (full -stack -> full-stack). Removing space before "." also
+# covers dotted names (config .py -> config.py)
+SPACING_RE = re.compile(r"\s+([.,;:!?])|\s*(['\"])\s*|(\()\s+|(\w)\s+-\s*(\w)")
+
+# ASCII text whose only whitespace is " " needs a SPACING_RE edit only if it
+# contains one of SPACING_TRIGGERS; plain substring scans rule that out fast
+ASCII_OTHER_WHITESPACE = "\t\n\r\x0b\x0c\x1c\x1d\x1e\x1f"
+SPACING_TRIGGERS = tuple(" " + c for c in ".,;:!?'\"-") + ("' ", '" ', "( ")
+
+
+def _fix_spacing_match(match: re.Match) -> str:
+    """Replacement for one SPACING_RE match."""
+    if match.group(4):
+        return f"{match.group(4)}-{match.group(5)}"
+    return match.group(1) or match.group(2) or match.group(3)
+
+
+# Whitespace after sentence-ending punctuation, where long texts are split
+SENTENCE_BREAK_RE = re.compile(r"(?<=[.!?])\s+")
+
+# Up to 5 words of an LLM title, skipping leading quotes/whitespace
+TITLE_RE = re.compile(r"^[\s\"']*((?:\S+[ \t]+){0,4}\S+)")
+
+# Minimum cosine similarity for a title cache hit. Cleaned text is cached by
+# exact normalized input only: inputs differing in a name, number or "not"
+# embed almost identically but must not share a cleaned transcript
+TITLE_CACHE_THRESHOLD = 0.85
+
+# Prompt templates; TITLE_PROMPT_TEMPLATE is filled with %-formatting per call
+TITLE_PROMPT_TEMPLATE = (
+    "Generate a short title (2-3 words maximum) that captures the main topic "
+    "of this transcript. Return ONLY the title, nothing else. No quotes, no punctuation at the end.\n\n"
+    "Transcript:\n%s"
+)
+
+# Batched titles: up to TITLE_BATCH_MAX snippets per request, one numbered
+# title per line in the reply
+TITLE_BATCH_MAX = 20
+BATCH_TITLE_PROMPT_TEMPLATE = (
+    "Generate a short title (2-3 words maximum) for each of the %d numbered "
+    "transcripts below. Return exactly %d titles, one per line, numbered like "
+    "the transcripts. No quotes, no punctuation at the end.\n\n%s"
+)
+NUMBERED_LINE_RE = re.compile(r"^\s*(\d+)[.)]\s*(.+)$", re.M)
+
+# Static chat preamble; the per-transcript context goes in a separate system
+# message after it so this prefix stays byte-identical for prompt caching
+CHAT_SYSTEM_PROMPT = """You're chatting with someone about their transcript. Be casual and brief - like talking to a friend.
+
+Rules:
+- Only answer from the transcript below. If it's not there, say "I don't see that mentioned"
+- Keep it SHORT - 1-2 sentences is usually enough
+- Sound natural, not robotic
+- No bullet points unless they ask for a list
+- Answer directly - don't restate the question"""
+
+# Appended to the user turn when several transcripts are cleaned in one request
+BATCH_CLEAN_INSTRUCTIONS = (
+    "Clean each of the {count} numbered transcripts below independently. "
+    "Return ONLY a JSON array of {count} strings, the cleaned transcripts in "
+    "the same order. No preamble, no code fences."
+)
+
+# Appended to the cleaning prompt when cleaning and titling in one request
+CLEAN_AND_TITLE_INSTRUCTIONS = (
+    'Return ONLY a JSON object with keys "cleaned" (the cleaned transcript, '
+    'following the rules above) and "title" (a short 2-3 word title for the '
+    "main topic, no quotes, no punctuation at the end)."
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _load_system_prompt() -> str:
+    """Read the cleaning prompt once, on first use (empty if the file is missing)."""
+    try:
+        return PROMPT_FILE.read_text().strip()
+    except FileNotFoundError:
+        logger.warning(f"System prompt file not found: {PROMPT_FILE}")
+        return ""
+
+
+def _is_default_prompt(system_prompt: str | None) -> bool:
+    """True when no custom prompt applies, including the default sent back as-is."""
+    return not system_prompt or system_prompt.strip() == _load_system_prompt()
+
+
+def __getattr__(name: str):
+    """Resolve the legacy SYSTEM_PROMPT constant lazily."""
+    if name == "SYSTEM_PROMPT":
+        return _load_system_prompt()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@functools.lru_cache(maxsize=1)
+def _get_tokenizer():
+    """Return the cl100k_base tiktoken encoding, or None if unavailable."""
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(
+            f"tiktoken unavailable ({e}); token budgets are estimated as "
+            "4 characters per token. Install tiktoken for exact counts"
+        )
+        return None
+
+
+def _title_snippet(text: str) -> str:
+    """Cut text to TITLE_SNIPPET_TOKENS tokens (500 chars without tiktoken)."""
+    encoding = _get_tokenizer()
+    if encoding is None:
+        return text[:500]
+    # ~4 chars per token; avoid encoding an entire long transcript
+    tokens = encoding.encode(text[: TITLE_SNIPPET_TOKENS * 8])
+    return encoding.decode(tokens[:TITLE_SNIPPET_TOKENS])
+
+
+def _load_local_llm(model_path: str):
+    """Load a small GGUF model with llama.cpp on CPU, or None if unavailable."""
+    try:
+        from llama_cpp import Llama
+
+        llm = Llama(model_path=model_path, n_ctx=2048, n_threads=os.cpu_count())
+        logger.info(f"Local cleaning model loaded from {model_path}")
+        return llm
+    except Exception as e:
+        logger.warning(f"Local cleaning model unavailable ({model_path}): {e}")
+        return None
+
+
+def _count_tokens(text: str) -> int:
+    """Count cl100k tokens in text (~4 chars per token without tiktoken)."""
+    encoding = _get_tokenizer()
+    if encoding is None:
+        return len(text) // 4
+    return len(encoding.encode(text))
+
+
+def _clean_max_tokens(text: str) -> int:
+    """Completion budget for cleaning text: its length plus rewording headroom."""
+    return _count_tokens(text) * 3 // 2 + 64
+
+
+def _chunk_by_tokens(text: str, max_tokens: int) -> list[str]:
+    """
+    Split text into chunks of at most ~max_tokens, breaking after sentences.
+
+    A single sentence longer than max_tokens becomes its own chunk. Chunks
+    don't overlap, since cleaned chunks are concatenated back together.
+    """
+    chunks: list[str] = []
+    current: list[str] = []
+    size = 0
+    for sentence in SENTENCE_BREAK_RE.split(text):
+        tokens = _count_tokens(sentence)
+        if current and size + tokens > max_tokens:
+            chunks.append(" ".join(current))
+            current, size = [], 0
+        current.append(sentence)
+        size += tokens
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def select_whisper_precision(compute_type: str = "auto") -> tuple[str, str]:
+    """
+    Pick the Whisper (device, compute_type) pair for the available hardware.
+
+    With "auto", the first type in COMPUTE_TYPE_PREFERENCES that CTranslate2
+    supports on the device is used: int8 weights with float16 activations on
+    CUDA (pure int8 is often slower on GPU), int8 on CPU. An explicit
+    compute_type is kept as-is.
+    """
+    try:
+        import ctranslate2
+
+        device = "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+        supported = set(ctranslate2.get_supported_compute_types(device))
+    except Exception:
+        device, supported = "cpu", set()
+
+    if compute_type == "auto":
+        preferences = COMPUTE_TYPE_PREFERENCES[device]
+        compute_type = next(
+            (ct for ct in preferences if ct in supported), preferences[0]
+        )
+    return device, compute_type
+
+
+@functools.cache
+def _get_whisper(
+    name: str, device: str, compute_type: str
+) -> tuple[WhisperModel, BatchedInferencePipeline]:
+    """
+    Load a Whisper model and its batched pipeline, once per process.
+
+    Services built with the same (name, device, compute_type) share the
+    weights instead of each holding their own GB-scale copy.
+    """
+    model = WhisperModel(name, device=device, compute_type=compute_type)
+    # Batched pipeline decodes a file's 30s windows in parallel batches
+    batched = BatchedInferencePipeline(model=model)
+    logger.info(f"Whisper model '{name}' loaded!")
+    return model, batched
+
+
+# Per-process WhisperModel, loaded once by each WhisperPool worker
+_worker_model: WhisperModel | None = None
+
+# CPU threads per pool worker; workers * threads should not exceed the cores
+WORKER_CPU_THREADS = 2
+
+
+def _init_whisper_worker(model_name: str, compute_type: str) -> None:
+    """Load the Whisper model into this worker process."""
+    global _worker_model
+    os.environ["OMP_NUM_THREADS"] = str(WORKER_CPU_THREADS)
+    _worker_model = WhisperModel(
+        model_name,
+        device="cpu",
+        compute_type=compute_type,
+        cpu_threads=WORKER_CPU_THREADS,
+    )
+
+
+def _worker_transcribe(audio_file: str) -> str:
+    """Transcribe one file with this worker's model (raw, unfixed text)."""
+    segments, info = _worker_model.transcribe(
+        audio_file, beam_size=config.WHISPER_BEAM_SIZE, **WHISPER_DECODE_OPTIONS
+    )
+    return " ".join(segment.text for segment in segments).strip()
+
+
+class WhisperPool:
+    """
+    Pool of worker processes, each holding its own CPU WhisperModel.
+
+    A single model serializes inference; separate processes let several
+    files transcribe in parallel across cores.
+    """
+
+    def __init__(self, model_name: str, compute_type: str, workers: int):
+        self.workers = workers
+        # Spawn, not fork: the parent already has loader threads and OpenMP
+        # state, which a forked child can inherit mid-lock and deadlock on
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_whisper_worker,
+            initargs=(model_name, compute_type),
+        )
+
+    def map(self, audio_files: list[str]) -> list[str]:
+        """Transcribe files in parallel, returning raw text in input order."""
+        return list(self._executor.map(_worker_transcribe, audio_files))
+
+    def close(self) -> None:
+        """Shut down the worker processes."""
+        self._executor.shutdown(cancel_futures=True)
+
+
+def _completion_text(response, stream: bool) -> str:
+    """Reply text of a chat completion, joining the deltas if it was streamed."""
+    if not stream:
+        return response.choices[0].message.content
+    return "".join(
+        chunk.choices[0].delta.content or "" for chunk in response if chunk.choices
+    )
+
+
+async def _acompletion_text(
+    response, stream: bool, first_token: asyncio.Event | None = None
+) -> str:
+    """Async _completion_text(); sets `first_token` when output starts."""
+    if not stream:
+        return response.choices[0].message.content
+    parts = []
+    async for chunk in response:
+        if chunk.choices:
+            parts.append(chunk.choices[0].delta.content or "")
+            if first_token is not None:
+                first_token.set()
+    return "".join(parts)
+
+
+def _prepare_messages(messages: list[dict]) -> list[dict]:
+    """
+    Strip internal "_cacheable" markers from messages before sending.
+
+    With LLM_CACHE_CONTROL on, marked messages become a text part carrying
+    an ephemeral cache_control marker so the provider caches that prefix.
+    """
+    prepared = []
+    for msg in messages:
+        if "_cacheable" not in msg:
+            prepared.append(msg)
+            continue
+        msg = {k: v for k, v in msg.items() if k != "_cacheable"}
+        if config.LLM_CACHE_CONTROL:
+            msg["content"] = [
+                {
+                    "type": "text",
+                    "text": msg["content"],
+                    "cache_control": {"type": "ephemeral"},
+                }
+            ]
+        prepared.append(msg)
+    return prepared
+
+
+async def hedged_call(
+    providers: Sequence["LLMProvider"],
+    call: Callable[["LLMProvider", asyncio.Event], Awaitable],
+    delay_ms: int = 800,
+):
+    """
+    Run `call` against providers in order, returning the first success.
+
+    `call(provider, first_token)` sets `first_token` once output starts
+    arriving. Each next provider is started once the previous one fails, or
+    after `delay_ms` if no running call has produced its first token yet, so
+    a slow-but-streaming provider is left to finish. Still-running calls are
+    cancelled as soon as one succeeds. Raises the last error if every
+    provider fails.
+    """
+    remaining = list(providers)
+    pending: dict[asyncio.Task, asyncio.Event] = {}
+    last_error: Exception | None = None
+    start_next = True
+    try:
+        while remaining or pending:
+            if start_next and remaining:
+                first_token = asyncio.Event()
+                task = asyncio.create_task(call(remaining.pop(0), first_token))
+                pending[task] = first_token
+            streaming = any(event.is_set() for event in pending.values())
+            done, _ = await asyncio.wait(
+                pending,
+                timeout=delay_ms / 1000 if remaining and not streaming else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            for task in done:
+                del pending[task]
+                if task.exception() is None:
+                    return task.result()
+                last_error = task.exception()
+            # Next provider on a failure, or when the delay passed with no output
+            start_next = bool(done) or not any(
+                event.is_set() for event in pending.values()
+            )
+    finally:
+        for task in pending:
+            task.cancel()
+    raise last_error or RuntimeError("No LLM providers available")
+
+
+# Circuit breaker: a provider that failed N times in a row is skipped for
+# min(BREAKER_MAX_OPEN_S, 2**N) seconds before being tried again
+BREAKER_MAX_OPEN_S = 60.0
+
+# Only errors that say the provider itself is unhealthy trip the breaker;
+# other API errors (bad request, auth, ...) are raised without counting
+BREAKER_ERRORS = (
+    APIConnectionError,
+    APITimeoutError,
+    InternalServerError,
+    RateLimitError,
+)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose circuit breaker is open."""
+
+
+# The OpenAI SDK's own retry default, for providers nothing else backs up
+SDK_MAX_RETRIES = 2
 
 
 class LLMProvider:
     """Wrapper for an OpenAI-compatible LLM provider."""
 
-    def __init__(self, base_url: str, api_key: str, model: str, name: str = "LLM"):
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        model: str,
+        name: str = "LLM",
+        http_client: httpx.Client | None = None,
+        max_retries: int = SDK_MAX_RETRIES,
+    ):
         self.name = name
         self.base_url = base_url
         self.model = model
-        self.client = OpenAI(base_url=base_url, api_key=api_key)
+        self.client = OpenAI(
+            base_url=base_url,
+            api_key=api_key,
+            http_client=http_client,
+            timeout=LLM_TIMEOUT,
+            max_retries=max_retries,
+        )
+        # Async companion for pipelined/concurrent callers
+        self.async_client = AsyncOpenAI(
+            base_url=base_url,
+            api_key=api_key,
+            timeout=LLM_TIMEOUT,
+            max_retries=max_retries,
+        )
+        self._semaphore = asyncio.Semaphore(PROVIDER_CONCURRENCY)
+        self._consecutive_failures = 0
+        self._open_until = 0.0
         logger.info(f"{name} initialized with model {model} at {base_url}")
 
+    def _check_circuit(self) -> None:
+        """Raise CircuitOpenError while the provider is in its backoff interval."""
+        if time.monotonic() < self._open_until:
+            raise CircuitOpenError(
+                f"{self.name} skipped after {self._consecutive_failures} failures"
+            )
+
+    def _record_failure(self) -> None:
+        self._consecutive_failures += 1
+        self._open_until = time.monotonic() + min(
+            BREAKER_MAX_OPEN_S, 2.0**self._consecutive_failures
+        )
+
+    def _record_success(self) -> None:
+        self._consecutive_failures = 0
+        self._open_until = 0.0
+
     def chat(
         self,
         messages: list[dict],
         temperature: float = 0.3,
         max_tokens: int = 200,
         stream: bool = False,
+        response_format: dict | None = None,
     ):
-        """Send a chat completion request."""
-        return self.client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            temperature=temperature,
-            max_tokens=max_tokens,
-            stream=stream,
-        )
+        """Send a chat completion request (CircuitOpenError if recently failing)."""
+        self._check_circuit()
+        extra = {"response_format": response_format} if response_format else {}
+        try:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=_prepare_messages(messages),
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=stream,
+                **extra,
+            )
+        except BREAKER_ERRORS:
+            self._record_failure()
+            raise
+        self._record_success()
+        return response
+
+    async def achat(
+        self,
+        messages: list[dict],
+        temperature: float = 0.3,
+        max_tokens: int = 200,
+        stream: bool = False,
+        response_format: dict | None = None,
+    ):
+        """Send a chat completion request without blocking the event loop."""
+        self._check_circuit()
+        extra = {"response_format": response_format} if response_format else {}
+        async with self._semaphore:
+            try:
+                response = await self.async_client.chat.completions.create(
+                    model=self.model,
+                    messages=_prepare_messages(messages),
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    stream=stream,
+                    **extra,
+                )
+            except BREAKER_ERRORS:
+                self._record_failure()
+                raise
+        self._record_success()
+        return response
 
 
 class TranscriptionService:
@@ -66,85 +601,422 @@ class TranscriptionService:
         fallback_base_url: str | None = None,
         fallback_api_key: str | None = None,
         fallback_model: str | None = None,
+        compute_type: str = "auto",
+        tiny_model_path: str | None = None,
     ):
         # Initialize Whisper
         logger.info(f"Loading Whisper model '{whisper_model}'...")
-        self.whisper = WhisperModel(
-            whisper_model,
-            device="auto",  # Auto-detect: Metal (Mac), CUDA (NVIDIA), or CPU
-            compute_type="int8",
+        device, compute_type = select_whisper_precision(compute_type)
+        logger.info(f"Whisper precision: device={device}, compute_type={compute_type}")
+        # Load in the background so the rest of setup isn't blocked on it;
+        # the whisper/batched properties wait for it on first use
+        self._whisper_args = (whisper_model, device, compute_type)
+        self._whisper_lock = threading.Lock()
+        self._whisper_future = self._load_whisper()
+        self.whisper_model = whisper_model
+        # Resolve the tokenizer now, so a missing tiktoken is reported at startup
+        _get_tokenizer()
+
+        # Optional worker processes for parallel multi-file CPU transcription
+        self._pool: WhisperPool | None = None
+        if device == "cpu" and config.WHISPER_CPU_WORKERS > 0:
+            self._pool = WhisperPool(
+                whisper_model, compute_type, config.WHISPER_CPU_WORKERS
+            )
+
+        # Raw transcripts are deterministic for identical audio + params
+        self._cache_dir = (
+            Path(config.TRANSCRIBE_CACHE_DIR).expanduser()
+            if config.TRANSCRIBE_CACHE_DIR
+            else None
         )
-        logger.info(f"Whisper model '{whisper_model}' loaded!")
 
-        # Initialize primary LLM provider
+        # Recently generated titles by snippet hash (exact match, LRU)
+        self._recent_titles: OrderedDict[bytes, str] = OrderedDict()
+
+        # Optional caches: exact repeats for cleaned text, embedding
+        # similarity for titles
+        self._clean_cache: SemanticCache | None = None
+        self._title_cache: SemanticCache | None = None
+        if config.SEMANTIC_CACHE:
+            self._embedder = EmbeddingService(
+                config.EMBEDDING_BASE_URL, config.EMBEDDING_MODEL
+            )
+            self._clean_cache = SemanticCache(
+                self._embed,
+                None,
+                config.SEMANTIC_CACHE_MAX_ENTRIES,
+                self._cache_dir / "semantic_clean.npz" if self._cache_dir else None,
+            )
+            self._title_cache = SemanticCache(
+                self._embed,
+                TITLE_CACHE_THRESHOLD,
+                config.SEMANTIC_CACHE_MAX_ENTRIES,
+                self._cache_dir / "semantic_title.npz" if self._cache_dir else None,
+            )
+
+        # One pooled HTTP client shared by all providers, so connections are
+        # kept alive across calls (HTTP/2 when the h2 package is installed)
+        self._http = httpx.Client(
+            http2=importlib.util.find_spec("h2") is not None,
+            timeout=LLM_TIMEOUT,
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+        )
+
+        # Initialize primary LLM provider. With a fallback configured, SDK
+        # retries are off: backoff would only delay falling back
+        has_fallback = bool(fallback_base_url and fallback_api_key and fallback_model)
         self.primary_provider = LLMProvider(
-            llm_base_url, llm_api_key, llm_model, "Primary LLM"
+            llm_base_url,
+            llm_api_key,
+            llm_model,
+            "Primary LLM",
+            self._http,
+            max_retries=0 if has_fallback else SDK_MAX_RETRIES,
         )
 
         # Initialize fallback provider if configured
         self.fallback_provider: LLMProvider | None = None
-        if fallback_base_url and fallback_api_key and fallback_model:
+        if has_fallback:
             self.fallback_provider = LLMProvider(
-                fallback_base_url, fallback_api_key, fallback_model, "Fallback LLM"
+                fallback_base_url,
+                fallback_api_key,
+                fallback_model,
+                "Fallback LLM",
+                self._http,
             )
 
-    def transcribe(self, audio_file: str) -> str:
-        """Transcribe audio file to text using Whisper."""
-        logger.info("Transcribing audio...")
+        # Optional small local model (llama.cpp), last resort for cleaning. One
+        # Llama instance isn't thread-safe, so calls into it are serialized
+        self._local_llm = _load_local_llm(tiny_model_path) if tiny_model_path else None
+        self._local_llm_lock = threading.Lock()
+
+        # Tried in order: primary, then fallback
+        self._providers: tuple[LLMProvider, ...] = (
+            (self.primary_provider,)
+            if self.fallback_provider is None
+            else (self.primary_provider, self.fallback_provider)
+        )
+
+    def _load_whisper(self) -> Future:
+        """Start loading the Whisper model on a background thread."""
+        loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="whisper-load")
+        future = loader.submit(_get_whisper, *self._whisper_args)
+        loader.shutdown(wait=False)
+        future.add_done_callback(self._log_whisper_load_error)
+        return future
+
+    def _log_whisper_load_error(self, future: Future) -> None:
+        """Report a failed background load as soon as it happens."""
+        error = future.exception()
+        if error is not None:
+            logger.error(
+                f"Whisper model '{self._whisper_args[0]}' failed to load: {error}"
+            )
+
+    def whisper_load_error(self) -> BaseException | None:
+        """The error of a finished, failed Whisper load; None otherwise."""
+        future = self._whisper_future
+        return future.exception() if future.done() else None
+
+    def _whisper_models(self) -> tuple[WhisperModel, BatchedInferencePipeline]:
+        """Wait for the Whisper load, retrying it if the last attempt failed."""
+        with self._whisper_lock:
+            if self.whisper_load_error() is not None:
+                logger.info("Retrying Whisper model load...")
+                self._whisper_future = self._load_whisper()
+            future = self._whisper_future
+        return future.result()
+
+    @property
+    def whisper(self) -> WhisperModel:
+        """The Whisper model, waiting for the background load if needed."""
+        return self._whisper_models()[0]
+
+    @property
+    def batched(self) -> BatchedInferencePipeline:
+        """Batched Whisper pipeline, waiting for the background load if needed."""
+        return self._whisper_models()[1]
+
+    def warmup(self) -> None:
+        """
+        Run one dummy transcription of a second of silence, then a 1-token
+        request per LLM provider.
+
+        Pays the one-off kernel selection/allocation and server-side model
+        load cost up front instead of on the first user request. Failures
+        are logged, not raised.
+        """
+        try:
+            segments, info = self.whisper.transcribe(
+                np.zeros(16000, dtype=np.float32), beam_size=1, language="en"
+            )
+            for _ in segments:
+                pass
+            logger.info("Whisper warmup complete")
+        except Exception as e:
+            logger.warning(f"Whisper warmup failed: {e}")
+
+        for provider in self._providers:
+            try:
+                provider.chat([{"role": "user", "content": "ok"}], max_tokens=1)
+                logger.info(f"{provider.name} warmup complete")
+            except Exception as e:
+                logger.warning(f"{provider.name} warmup failed: {e}")
+
+    def close(self) -> None:
+        """Release pooled HTTP connections and Whisper worker processes."""
+        for cache in (self._clean_cache, self._title_cache):
+            if cache is not None:
+                cache.save()
+        self._http.close()
+        if self._pool is not None:
+            self._pool.close()
+
+    def _embed(self, text: str) -> list[float]:
+        """Embed text for the semantic caches over the shared HTTP client."""
+        return self._embedder.embed_text_sync(text, self._http)
+
+    @staticmethod
+    def _cache_get(cache: SemanticCache | None, text: str) -> str | None:
+        """Semantic cache lookup; embedding failures count as a miss."""
+        if cache is None:
+            return None
+        try:
+            return cache.get(text)
+        except Exception as e:
+            logger.debug(f"Semantic cache lookup failed: {e}")
+            return None
+
+    @staticmethod
+    def _cache_put(cache: SemanticCache | None, text: str, response: str) -> None:
+        """Semantic cache insert; embedding failures are ignored."""
+        if cache is None:
+            return
+        try:
+            cache.put(text, response)
+        except Exception as e:
+            logger.debug(f"Semantic cache insert failed: {e}")
+
+    def transcribe(self, audio_file: str, beam_size: int | None = None) -> str:
+        """Transcribe audio file to text using Whisper (beam from WHISPER_BEAM_SIZE)."""
+        beam_size = beam_size or config.WHISPER_BEAM_SIZE
+        return self._run_whisper(
+            audio_file, f"beam{beam_size}-vad", beam_size=beam_size
+        )
+
+    def transcribe_fast(self, audio_file: str) -> str:
+        """
+        Transcribe with greedy decoding for latency-sensitive, short clips.
+
+        Unlike transcribe(), never re-decodes at higher temperatures, at a
+        small accuracy cost that matters mostly on long-form audio.
+        """
+        return self._run_whisper(
+            audio_file,
+            "fast",
+            beam_size=1,
+            best_of=1,
+            temperature=0.0,
+            vad_filter=True,
+        )
+
+    def transcribe_stream(
+        self, audio_file: str, beam_size: int | None = None
+    ) -> Iterator[str]:
+        """
+        Transcribe audio file, yielding each segment's text as it is decoded.
+
+        Lets callers start downstream work (e.g. LLM cleaning) before Whisper
+        finishes; segments are independent with condition_on_previous_text off.
+        """
+        segments, info = self.whisper.transcribe(
+            audio_file,
+            beam_size=beam_size or config.WHISPER_BEAM_SIZE,
+            **WHISPER_DECODE_OPTIONS,
+        )
+        for segment in segments:
+            text = self._fix_whisper_spacing(segment.text.strip())
+            if text:
+                yield text
+
+    def _run_whisper(self, audio_file: str, mode: str, **decode_options) -> str:
+        """Decode with WHISPER_DECODE_OPTIONS plus overrides, via the transcript cache."""
+        cache_path = self._transcript_cache_path(audio_file, mode)
+        if cache_path is not None and cache_path.is_file():
+            logger.info("Transcription cache hit")
+            return cache_path.read_text(encoding="utf-8")
+
+        logger.info(f"Transcribing audio ({mode})...")
 
         segments, info = self.whisper.transcribe(
-            audio_file, beam_size=5, language="en", condition_on_previous_text=False
+            audio_file, **{**WHISPER_DECODE_OPTIONS, **decode_options}
         )
 
-        text = " ".join([segment.text for segment in segments]).strip()
+        text = self._join_segments(segments)
 
         # Fix common Whisper spacing issues
         text = self._fix_whisper_spacing(text)
 
         logger.info(f"Transcription complete: {len(text)} characters")
+        if cache_path is not None:
+            self._write_transcript_cache(cache_path, text)
         return text
 
+    def _transcript_cache_path(self, audio_file: str, params: str) -> Path | None:
+        """Cache file for this audio's content, model and decode params, or None."""
+        if self._cache_dir is None:
+            return None
+        digest = hashlib.blake2b(digest_size=20)
+        try:
+            with open(audio_file, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+        except OSError:
+            return None
+        digest.update(f"{self.whisper_model}_{params}".encode())
+        return self._cache_dir / f"{digest.hexdigest()}.txt"
+
+    @staticmethod
+    def _write_transcript_cache(cache_path: Path, text: str) -> None:
+        """Write a cache entry atomically; caching failures are never fatal."""
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(text, encoding="utf-8")
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"Could not write transcription cache: {e}")
+            tmp_path.unlink(missing_ok=True)
+
+    def transcribe_many(
+        self, audio_files: list[str], batch_size: int = 16
+    ) -> list[str]:
+        """
+        Transcribe several audio files using the batched Whisper pipeline.
+
+        Each file's audio is split into VAD-delimited windows that are encoded
+        `batch_size` at a time, keeping the encoder saturated. Results are
+        returned in the same order as `audio_files`.
+
+        When WHISPER_CPU_WORKERS is set on a CPU host, files are instead
+        spread across the WhisperPool worker processes.
+        """
+        logger.info(f"Batch transcribing {len(audio_files)} audio files...")
+
+        if self._pool is not None:
+            texts = [self._fix_whisper_spacing(t) for t in self._pool.map(audio_files)]
+            logger.info(
+                f"Batch transcription complete: {len(texts)} files "
+                f"({self._pool.workers} workers)"
+            )
+            return texts
+
+        texts = []
+        for audio_file in audio_files:
+            segments, info = self.batched.transcribe(
+                audio_file,
+                batch_size=batch_size,
+                beam_size=config.WHISPER_BEAM_SIZE,
+                **WHISPER_DECODE_OPTIONS,
+            )
+            text = self._join_segments(segments)
+            texts.append(self._fix_whisper_spacing(text))
+
+        logger.info(f"Batch transcription complete: {len(texts)} files")
+        return texts
+
+    def _join_segments(self, segments) -> str:
+        """
+        Drain Whisper's lazy segment generator into a single string.
+
+        Only each segment's text is kept, so the Segment objects can be freed
+        as decoding proceeds; progress is logged every few segments.
+        """
+        parts = []
+        for count, segment in enumerate(segments, start=1):
+            parts.append(segment.text)
+            if count % SEGMENT_LOG_INTERVAL == 0:
+                logger.debug(f"Transcribed {count} segments so far...")
+        return " ".join(parts).strip()
+
     def _fix_whisper_spacing(self, text: str) -> str:
         """Fix spacing issues from Whisper tokenizer."""
-        # Remove spaces before punctuation
-        text = re.sub(r"\s+([.,;:!?'\"])", r"\1", text)
-        # Fix spaces after opening quotes/brackets
-        text = re.sub(r"(['\"\(])\s+", r"\1", text)
-        # Fix hyphenated words (full -stack -> full-stack)
-        text = re.sub(r"(\w)\s+-\s*(\w)", r"\1-\2", text)
-        # Fix spaces before file extensions or dots in names
-        text = re.sub(r"(\w)\s+\.(\w)", r"\1.\2", text)
-        return text
+        # Fast path: most transcripts are ASCII with nothing to fix
+        if (
+            text.isascii()
+            and not any(c in text for c in ASCII_OTHER_WHITESPACE)
+            and not any(t in text for t in SPACING_TRIGGERS)
+        ):
+            return text
+        return SPACING_RE.sub(_fix_spacing_match, text)
 
     def get_default_system_prompt(self) -> str:
         """Get the default system prompt for cleaning."""
-        return SYSTEM_PROMPT
+        return _load_system_prompt()
 
     def clean_with_llm(self, text: str, system_prompt: str | None = None) -> str:
-        """Clean transcribed text using LLM."""
+        """
+        Clean transcribed text using LLM.
+
+        Texts over CLEAN_CHUNK_THRESHOLD_TOKENS are split on sentence
+        boundaries and the chunks cleaned in parallel, keeping each prefill
+        short. Any chunk that can't be cleaned is kept raw.
+        """
         if not text:
             return ""
 
-        prompt_to_use = system_prompt if system_prompt else SYSTEM_PROMPT
+        if self._skip_cleaning(text, system_prompt):
+            return text
+
+        # Only default-prompt results are cached; custom prompts clean differently
+        cache = self._clean_cache if _is_default_prompt(system_prompt) else None
+        cached = self._cache_get(cache, text)
+        if cached is not None:
+            logger.info("LLM cleaning served from semantic cache")
+            return cached
+
+        prompt_to_use = system_prompt if system_prompt else _load_system_prompt()
         logger.info("Cleaning text with LLM...")
 
-        # Try primary, then fallback
-        providers = [self.primary_provider]
-        if self.fallback_provider:
-            providers.append(self.fallback_provider)
+        if _count_tokens(text) > CLEAN_CHUNK_THRESHOLD_TOKENS:
+            chunks = _chunk_by_tokens(text, CLEAN_CHUNK_TOKENS)
+            logger.info(f"Cleaning long text in {len(chunks)} chunks...")
+            # Chunks that reach the local tier still run one at a time there
+            workers = min(len(chunks), PROVIDER_CONCURRENCY)
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(
+                    pool.map(self._clean_text, chunks, [prompt_to_use] * len(chunks))
+                )
+        else:
+            chunks = [text]
+            results = [self._clean_text(text, prompt_to_use)]
+
+        if None in results:
+            # Fallback to raw text for whatever couldn't be cleaned
+            return "\n\n".join(
+                raw if cleaned is None else cleaned
+                for raw, cleaned in zip(chunks, results, strict=True)
+            )
+        cleaned = "\n\n".join(results)
+        self._cache_put(cache, text, cleaned)
+        return cleaned
 
+    def _clean_text(self, text: str, prompt: str) -> str | None:
+        """Clean one text with provider fallback; None if every provider fails."""
         last_error = None
-        for provider in providers:
+        for provider in self._providers:
             try:
                 response = provider.chat(
                     messages=[
-                        {"role": "system", "content": prompt_to_use},
+                        {"role": "system", "content": prompt, "_cacheable": True},
                         {"role": "user", "content": text},
                     ],
                     temperature=0.3,
-                    max_tokens=2000,  # Allow longer cleaned outputs
+                    max_tokens=_clean_max_tokens(text),
+                    stream=config.LLM_STREAM_CLEAN,
                 )
-                cleaned = response.choices[0].message.content.strip()
+                cleaned = _completion_text(response, config.LLM_STREAM_CLEAN).strip()
                 logger.info(
                     f"LLM cleaning complete via {provider.name}: {len(cleaned)} chars"
                 )
@@ -155,45 +1027,337 @@ class TranscriptionService:
                 logger.warning(f"{provider.name} failed: {e}")
                 continue
 
+        if self._local_llm is not None:
+            try:
+                return self._clean_locally(text, prompt)
+            except Exception as e:
+                last_error = e
+                logger.warning(f"Local model failed: {e}")
+
         # All providers failed
         if last_error:
             logger.error(f"All LLM providers failed. Last error: {last_error}")
-        return text  # Fallback to raw text
+        return None
+
+    def _clean_locally(self, text: str, prompt: str) -> str:
+        """Clean text with the local llama.cpp model, one call at a time."""
+        with self._local_llm_lock:
+            result = self._local_llm.create_chat_completion(
+                messages=[
+                    {"role": "system", "content": prompt},
+                    {"role": "user", "content": text},
+                ],
+                temperature=0.3,
+                max_tokens=_clean_max_tokens(text),
+            )
+        cleaned = result["choices"][0]["message"]["content"].strip()
+        logger.info(f"LLM cleaning complete via local model: {len(cleaned)} chars")
+        return cleaned
+
+    def clean_with_llm_stream(
+        self, text: str, system_prompt: str | None = None
+    ) -> Iterator[str]:
+        """
+        Clean transcribed text using LLM, yielding text as tokens arrive.
+
+        Callers can persist or display partial output immediately, or
+        "".join() the chunks for the full text. Falls back to the next
+        provider only if nothing has been yielded yet; the raw text is
+        yielded if every provider fails.
+        """
+        if not text:
+            return
+
+        if self._skip_cleaning(text, system_prompt):
+            yield text
+            return
+
+        prompt_to_use = system_prompt if system_prompt else _load_system_prompt()
+        logger.info("Streaming text cleaning with LLM...")
+
+        for provider in self._providers:
+            started = False
+            try:
+                response = provider.chat(
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": prompt_to_use,
+                            "_cacheable": True,
+                        },
+                        {"role": "user", "content": text},
+                    ],
+                    temperature=0.3,
+                    max_tokens=_clean_max_tokens(text),
+                    stream=True,
+                )
+                for chunk in response:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        started = True
+                        yield chunk.choices[0].delta.content
+                logger.info(f"LLM streaming cleaning complete via {provider.name}")
+                return
+
+            except Exception as e:
+                if started:
+                    logger.error(f"{provider.name} failed mid-stream: {e}")
+                    return
+                logger.warning(f"{provider.name} failed: {e}")
+                continue
+
+        logger.error("All LLM providers failed, returning raw text")
+        yield text
+
+    def _skip_cleaning(self, text: str, system_prompt: str | None) -> bool:
+        """Default cleaning of very short text isn't worth a round-trip."""
+        if not _is_default_prompt(system_prompt):
+            return False
+        if len(text) < config.CLEAN_MIN_CHARS:
+            logger.info("Skipping LLM cleaning: text is shorter than CLEAN_MIN_CHARS")
+            return True
+        return False
+
+    def clean_batch_with_llm(
+        self, texts: list[str], system_prompt: str | None = None
+    ) -> list[str]:
+        """
+        Clean several transcripts with a single LLM request.
+
+        Transcripts are numbered in one user message and the model returns a
+        JSON array, amortizing request overhead across short clips. Falls back
+        to per-text clean_with_llm() if the batched response can't be used.
+        """
+        if not texts:
+            return []
+        if len(texts) == 1:
+            return [self.clean_with_llm(texts[0], system_prompt)]
+
+        prompt_to_use = system_prompt if system_prompt else _load_system_prompt()
+        numbered = "\n\n".join(
+            f"### {i}\n{text}" for i, text in enumerate(texts, start=1)
+        )
+        user_content = (
+            BATCH_CLEAN_INSTRUCTIONS.format(count=len(texts)) + "\n\n" + numbered
+        )
+        logger.info(f"Batch cleaning {len(texts)} texts with LLM...")
+
+        for provider in self._providers:
+            try:
+                response = provider.chat(
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": prompt_to_use,
+                            "_cacheable": True,
+                        },
+                        {"role": "user", "content": user_content},
+                    ],
+                    temperature=0.3,
+                    # Each text's budget, as for single-text cleaning
+                    max_tokens=sum(_clean_max_tokens(text) for text in texts),
+                )
+                cleaned = self._parse_json_list(
+                    response.choices[0].message.content, len(texts)
+                )
+                logger.info(f"LLM batch cleaning complete via {provider.name}")
+                return cleaned
+
+            except Exception as e:
+                logger.warning(f"{provider.name} batch cleaning failed: {e}")
+                continue
+
+        logger.warning("Batch cleaning failed, cleaning texts one by one")
+        return [self.clean_with_llm(text, system_prompt) for text in texts]
+
+    def clean_and_title(
+        self, text: str, system_prompt: str | None = None
+    ) -> tuple[str, str]:
+        """
+        Clean text and generate its title with a single LLM request.
+
+        The model returns {"cleaned": ..., "title": ...} as JSON, saving a
+        second prefill over the same transcript. Falls back to separate
+        clean_with_llm() and generate_title() calls if that fails.
+
+        Returns:
+            Tuple of (cleaned_text, title)
+        """
+        if not text:
+            return "", "Untitled"
+
+        if self._skip_cleaning(text, system_prompt):
+            return text, self.generate_title(text)
+
+        # Long texts are cleaned in chunks; one fused reply would be truncated
+        if _count_tokens(text) > CLEAN_CHUNK_THRESHOLD_TOKENS:
+            cleaned = self.clean_with_llm(text, system_prompt)
+            return cleaned, self.generate_title(cleaned)
+
+        logger.info("Cleaning and titling text with LLM...")
+        messages = self._clean_and_title_messages(text, system_prompt)
+
+        for provider in self._providers:
+            try:
+                response = provider.chat(
+                    messages=messages,
+                    temperature=0.3,
+                    # Cleaned text plus the title and JSON keys
+                    max_tokens=_clean_max_tokens(text) + 32,
+                    response_format={"type": "json_object"},
+                )
+                result = self._parse_clean_and_title(
+                    response.choices[0].message.content
+                )
+                logger.info(f"LLM clean + title complete via {provider.name}")
+                return result
+
+            except Exception as e:
+                logger.warning(f"{provider.name} clean + title failed: {e}")
+                continue
+
+        logger.warning("Fused clean + title failed, falling back to separate calls")
+        cleaned = self.clean_with_llm(text, system_prompt)
+        return cleaned, self.generate_title(cleaned)
+
+    @staticmethod
+    def _clean_and_title_messages(text: str, system_prompt: str | None) -> list[dict]:
+        """Messages asking for the cleaned text and a title as one JSON object."""
+        prompt_to_use = system_prompt if system_prompt else _load_system_prompt()
+        return [
+            {
+                "role": "system",
+                "content": prompt_to_use + "\n\n" + CLEAN_AND_TITLE_INSTRUCTIONS,
+            },
+            {"role": "user", "content": text},
+        ]
+
+    def _parse_clean_and_title(self, content: str) -> tuple[str, str]:
+        """Parse a fused {"cleaned", "title"} reply; ValueError if unusable."""
+        result = _json.loads(content)
+        cleaned, title = result["cleaned"], result["title"]
+        if not isinstance(cleaned, str) or not isinstance(title, str):
+            raise ValueError("Expected string 'cleaned' and 'title' values")
+        return cleaned.strip(), self._tidy_title(title)
+
+    @staticmethod
+    def _tidy_title(title: str) -> str:
+        """Drop quotes and trailing punctuation from an LLM title, ~5 words max."""
+        match = TITLE_RE.match(title)
+        title = match.group(1).rstrip("\"',.! ") if match else ""
+        return title if title else "Untitled"
+
+    @staticmethod
+    def _parse_json_list(content: str, expected: int) -> list[str]:
+        """Parse a JSON array of strings from an LLM reply, tolerating fences."""
+        start, end = content.find("["), content.rfind("]")
+        if start == -1 or end < start:
+            raise ValueError("No JSON array in LLM response")
+        items = _json.loads(content[start : end + 1])
+        if len(items) != expected or not all(isinstance(i, str) for i in items):
+            raise ValueError(f"Expected {expected} strings, got {len(items)} items")
+        return [item.strip() for item in items]
+
+    async def transcribe_file_async(
+        self, audio_file: str, system_prompt: str | None = None
+    ) -> tuple[str, str]:
+        """
+        Transcribe and clean an audio file as a two-stage pipeline.
+
+        Whisper decodes in a worker thread and hands off ~PIPELINE_CHUNK_CHARS
+        chunks through a queue; each chunk is cleaned by the LLM while the next
+        one is still being decoded.
+
+        Returns:
+            Tuple of (raw_text, cleaned_text)
+        """
+        prompt_to_use = system_prompt if system_prompt else _load_system_prompt()
+        queue: asyncio.Queue[str | None] = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+
+        def produce_chunks() -> None:
+            """Decode audio and push text chunks into the queue."""
+            try:
+                buffer: list[str] = []
+                size = 0
+                for text in self.transcribe_stream(audio_file):
+                    buffer.append(text)
+                    size += len(text)
+                    if size >= PIPELINE_CHUNK_CHARS:
+                        loop.call_soon_threadsafe(queue.put_nowait, " ".join(buffer))
+                        buffer, size = [], 0
+                if buffer:
+                    loop.call_soon_threadsafe(queue.put_nowait, " ".join(buffer))
+            finally:
+                # Signal completion
+                loop.call_soon_threadsafe(queue.put_nowait, None)
+
+        async def consume_chunks() -> tuple[list[str], list[str]]:
+            """Clean chunks as they arrive."""
+            raw_parts: list[str] = []
+            cleaned_parts: list[str] = []
+            while True:
+                chunk = await queue.get()
+                if chunk is None:
+                    break
+                chunk = self._fix_whisper_spacing(chunk.strip())
+                if not chunk:
+                    continue
+                raw_parts.append(chunk)
+                cleaned = await self._aclean_text(chunk, prompt_to_use)
+                cleaned_parts.append(chunk if cleaned is None else cleaned)
+            return raw_parts, cleaned_parts
+
+        logger.info("Transcribing and cleaning audio (pipelined)...")
+        _, (raw_parts, cleaned_parts) = await asyncio.gather(
+            asyncio.to_thread(produce_chunks), consume_chunks()
+        )
+
+        raw_text = " ".join(raw_parts)
+        cleaned_text = " ".join(cleaned_parts)
+        logger.info(
+            f"Pipelined transcription complete: {len(raw_text)} raw chars, "
+            f"{len(cleaned_text)} cleaned chars"
+        )
+        return raw_text, cleaned_text
 
     def generate_title(self, text: str) -> str:
         """Generate a short 2-3 word title for transcript text using LLM."""
         if not text:
             return "Untitled"
 
-        # Take first 500 chars to keep it fast
-        snippet = text[:500]
+        # A few words already make a title; no need to ask the LLM
+        words = text.split()
+        if len(words) <= 3:
+            return " ".join(words) if words else "Untitled"
 
-        title_prompt = (
-            "Generate a short title (2-3 words maximum) that captures the main topic "
-            "of this transcript. Return ONLY the title, nothing else. No quotes, no punctuation at the end.\n\n"
-            f"Transcript:\n{snippet}"
-        )
+        # Fixed token budget keeps prefill cost predictable
+        snippet = _title_snippet(text)
 
-        # Try primary, then fallback
-        providers = [self.primary_provider]
-        if self.fallback_provider:
-            providers.append(self.fallback_provider)
+        # Exact repeat of a recent snippet (reload, retry): reuse its title
+        key = self._title_key(snippet)
+        if key in self._recent_titles:
+            self._recent_titles.move_to_end(key)
+            return self._recent_titles[key]
 
-        for provider in providers:
+        cached = self._cache_get(self._title_cache, text)
+        if cached is not None:
+            logger.info(f"Title served from semantic cache: {cached}")
+            return cached
+
+        title_prompt = TITLE_PROMPT_TEMPLATE % snippet
+
+        for provider in self._providers:
             try:
                 response = provider.chat(
                     messages=[{"role": "user", "content": title_prompt}],
                     temperature=0.7,
                     max_tokens=20,
                 )
-                title = response.choices[0].message.content.strip()
-                # Clean up: remove quotes, limit length
-                title = title.strip("\"'").strip()
-                # Limit to ~5 words max
-                words = title.split()[:5]
-                title = " ".join(words)
+                title = self._tidy_title(response.choices[0].message.content)
                 logger.info(f"Generated title via {provider.name}: {title}")
-                return title if title else "Untitled"
+                self._remember_title(key, title)
+                self._cache_put(self._title_cache, text, title)
+                return title
 
             except Exception as e:
                 logger.warning(f"Title generation failed via {provider.name}: {e}")
@@ -203,6 +1367,87 @@ class TranscriptionService:
         words = text.strip().split()[:3]
         return " ".join(words) if words else "Untitled"
 
+    def generate_titles(self, texts: list[str]) -> list[str]:
+        """
+        Generate titles for several transcripts, TITLE_BATCH_MAX per LLM request.
+
+        Very short texts and recently titled snippets need no request; any
+        title missing from a batched reply falls back to generate_title().
+        """
+        titles: list[str | None] = [None] * len(texts)
+        pending: list[tuple[int, str, bytes]] = []
+        for i, text in enumerate(texts):
+            words = text.split()
+            if len(words) <= 3:
+                titles[i] = " ".join(words) if words else "Untitled"
+                continue
+            snippet = _title_snippet(text)
+            key = self._title_key(snippet)
+            if key in self._recent_titles:
+                self._recent_titles.move_to_end(key)
+                titles[i] = self._recent_titles[key]
+            else:
+                pending.append((i, snippet, key))
+
+        for start in range(0, len(pending), TITLE_BATCH_MAX):
+            batch = pending[start : start + TITLE_BATCH_MAX]
+            batch_titles = self._generate_title_batch([s for _, s, _ in batch])
+            for (i, _, key), title in zip(batch, batch_titles, strict=True):
+                if title is not None:
+                    titles[i] = title
+                    self._remember_title(key, title)
+
+        return [
+            title if title is not None else self.generate_title(text)
+            for title, text in zip(titles, texts, strict=True)
+        ]
+
+    def _generate_title_batch(self, snippets: list[str]) -> list[str | None]:
+        """Titles for snippets from one LLM request; None where one is missing."""
+        numbered = "\n".join(
+            f"{i}. {' '.join(snippet.split())}"
+            for i, snippet in enumerate(snippets, start=1)
+        )
+        prompt = BATCH_TITLE_PROMPT_TEMPLATE % (len(snippets), len(snippets), numbered)
+
+        for provider in self._providers:
+            try:
+                response = provider.chat(
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.7,
+                    max_tokens=20 * len(snippets),
+                )
+                found = {
+                    int(number): self._tidy_title(title)
+                    for number, title in NUMBERED_LINE_RE.findall(
+                        response.choices[0].message.content
+                    )
+                }
+                logger.info(
+                    f"Generated {len(found)}/{len(snippets)} titles via {provider.name}"
+                )
+                return [found.get(i) for i in range(1, len(snippets) + 1)]
+
+            except Exception as e:
+                logger.warning(
+                    f"Batch title generation failed via {provider.name}: {e}"
+                )
+                continue
+
+        return [None] * len(snippets)
+
+    @staticmethod
+    def _title_key(snippet: str) -> bytes:
+        """Exact-match key for a title snippet."""
+        return hashlib.blake2b(snippet.encode("utf-8"), digest_size=16).digest()
+
+    def _remember_title(self, key: bytes, title: str) -> None:
+        """Store a generated title, evicting the least recently used if full."""
+        self._recent_titles[key] = title
+        self._recent_titles.move_to_end(key)
+        if len(self._recent_titles) > RECENT_TITLES_MAX:
+            self._recent_titles.popitem(last=False)
+
     def chat(
         self,
         message: str,
@@ -224,6 +1469,223 @@ class TranscriptionService:
         Returns:
             Chat response (streaming or non-streaming)
         """
+        messages = self._build_chat_messages(
+            message, context, chat_history, relevant_chunks
+        )
+
+        for provider in self._providers:
+            try:
+                return provider.chat(
+                    messages=messages,
+                    temperature=0.2,
+                    max_tokens=1500,
+                    stream=stream,
+                )
+            except Exception as e:
+                logger.warning(f"{provider.name} chat failed: {e}")
+                continue
+
+        raise RuntimeError("No LLM providers available")
+
+    async def _acall(self, call: Callable[[LLMProvider, asyncio.Event], Awaitable]):
+        """
+        Run an async provider call with fallback.
+
+        With HEDGED_LLM on and a fallback configured, the fallback is raced
+        against a primary with no output yet (see hedged_call); otherwise
+        providers are tried one after another.
+        """
+        if config.HEDGED_LLM and len(self._providers) > 1:
+            return await hedged_call(self._providers, call, config.HEDGE_DELAY_MS)
+
+        last_error: Exception | None = None
+        for provider in self._providers:
+            try:
+                return await call(provider, asyncio.Event())
+            except Exception as e:
+                last_error = e
+                logger.warning(f"{provider.name} failed: {e}")
+        raise last_error or RuntimeError("No LLM providers available")
+
+    async def aclean_with_llm(self, text: str, system_prompt: str | None = None) -> str:
+        """Async clean_with_llm(), racing providers when hedging is enabled."""
+        if not text:
+            return ""
+
+        if self._skip_cleaning(text, system_prompt):
+            return text
+
+        cache = self._clean_cache if _is_default_prompt(system_prompt) else None
+        cached = await asyncio.to_thread(self._cache_get, cache, text)
+        if cached is not None:
+            logger.info("LLM cleaning served from semantic cache")
+            return cached
+
+        prompt_to_use = system_prompt if system_prompt else _load_system_prompt()
+
+        if _count_tokens(text) > CLEAN_CHUNK_THRESHOLD_TOKENS:
+            chunks = _chunk_by_tokens(text, CLEAN_CHUNK_TOKENS)
+            logger.info(f"Cleaning long text in {len(chunks)} chunks...")
+        else:
+            chunks = [text]
+        results = await asyncio.gather(
+            *(self._aclean_text(chunk, prompt_to_use) for chunk in chunks)
+        )
+
+        if None in results:
+            # Fallback to raw text for whatever couldn't be cleaned
+            return "\n\n".join(
+                raw if cleaned is None else cleaned
+                for raw, cleaned in zip(chunks, results, strict=True)
+            )
+        cleaned = "\n\n".join(results)
+        await asyncio.to_thread(self._cache_put, cache, text, cleaned)
+        return cleaned
+
+    async def _aclean_text(self, text: str, prompt: str) -> str | None:
+        """Async _clean_text(); None if every provider fails."""
+        messages = [
+            {"role": "system", "content": prompt, "_cacheable": True},
+            {"role": "user", "content": text},
+        ]
+
+        async def clean(provider: LLMProvider, first_token: asyncio.Event) -> str:
+            stream = config.LLM_STREAM_CLEAN
+            response = await provider.achat(
+                messages=messages,
+                temperature=0.3,
+                max_tokens=_clean_max_tokens(text),
+                stream=stream,
+            )
+            cleaned = (await _acompletion_text(response, stream, first_token)).strip()
+            logger.info(
+                f"LLM cleaning complete via {provider.name}: {len(cleaned)} chars"
+            )
+            return cleaned
+
+        try:
+            return await self._acall(clean)
+        except Exception as e:
+            last_error = e
+            if self._local_llm is not None:
+                try:
+                    return await asyncio.to_thread(self._clean_locally, text, prompt)
+                except Exception as local_error:
+                    last_error = local_error
+                    logger.warning(f"Local model failed: {local_error}")
+            logger.error(f"All LLM providers failed. Last error: {last_error}")
+            return None
+
+    async def aclean_and_title(
+        self, text: str, system_prompt: str | None = None
+    ) -> tuple[str, str]:
+        """Async clean_and_title(), racing providers when hedging is enabled."""
+        if not text:
+            return "", "Untitled"
+
+        if self._skip_cleaning(text, system_prompt):
+            return text, await self.agenerate_title(text)
+
+        # Long texts are cleaned in chunks; one fused reply would be truncated
+        if _count_tokens(text) > CLEAN_CHUNK_THRESHOLD_TOKENS:
+            cleaned = await self.aclean_with_llm(text, system_prompt)
+            return cleaned, await self.agenerate_title(cleaned)
+
+        messages = self._clean_and_title_messages(text, system_prompt)
+
+        async def fused(
+            provider: LLMProvider, first_token: asyncio.Event
+        ) -> tuple[str, str]:
+            response = await provider.achat(
+                messages=messages,
+                temperature=0.3,
+                max_tokens=_clean_max_tokens(text) + 32,
+                response_format={"type": "json_object"},
+            )
+            result = self._parse_clean_and_title(response.choices[0].message.content)
+            logger.info(f"LLM clean + title complete via {provider.name}")
+            return result
+
+        try:
+            return await self._acall(fused)
+        except Exception as e:
+            logger.warning(f"Fused clean + title failed ({e}), using separate calls")
+
+        cleaned = await self.aclean_with_llm(text, system_prompt)
+        return cleaned, await self.agenerate_title(cleaned)
+
+    async def agenerate_title(self, text: str) -> str:
+        """Async generate_title(), racing providers when hedging is enabled."""
+        words = text.split()
+        if len(words) <= 3:
+            return " ".join(words) if words else "Untitled"
+
+        snippet = _title_snippet(text)
+        key = self._title_key(snippet)
+        if key in self._recent_titles:
+            self._recent_titles.move_to_end(key)
+            return self._recent_titles[key]
+
+        cached = await asyncio.to_thread(self._cache_get, self._title_cache, text)
+        if cached is not None:
+            logger.info(f"Title served from semantic cache: {cached}")
+            return cached
+
+        title_prompt = TITLE_PROMPT_TEMPLATE % snippet
+
+        async def title(provider: LLMProvider, first_token: asyncio.Event) -> str:
+            response = await provider.achat(
+                messages=[{"role": "user", "content": title_prompt}],
+                temperature=0.7,
+                max_tokens=20,
+            )
+            result = self._tidy_title(response.choices[0].message.content)
+            logger.info(f"Generated title via {provider.name}: {result}")
+            return result
+
+        try:
+            result = await self._acall(title)
+        except Exception as e:
+            logger.warning(f"Title generation failed: {e}")
+            # Fallback: first 3 words of text
+            return " ".join(words[:3])
+
+        self._remember_title(key, result)
+        await asyncio.to_thread(self._cache_put, self._title_cache, text, result)
+        return result
+
+    async def achat(
+        self,
+        message: str,
+        context: str | None = None,
+        chat_history: list[dict] | None = None,
+        relevant_chunks: list[str] | None = None,
+        stream: bool = False,
+    ):
+        """Async chat(), racing providers when hedging is enabled."""
+        messages = self._build_chat_messages(
+            message, context, chat_history, relevant_chunks
+        )
+
+        async def send(provider: LLMProvider, first_token: asyncio.Event):
+            return await provider.achat(
+                messages=messages, temperature=0.2, max_tokens=1500, stream=stream
+            )
+
+        try:
+            return await self._acall(send)
+        except Exception as e:
+            logger.warning(f"Chat failed: {e}")
+            raise RuntimeError("No LLM providers available") from e
+
+    @staticmethod
+    def _build_chat_messages(
+        message: str,
+        context: str | None,
+        chat_history: list[dict] | None,
+        relevant_chunks: list[str] | None,
+    ) -> list[dict]:
+        """Build the chat() message list: prompt, context, history, message."""
         # Build context from relevant chunks if available, else use full context
         if relevant_chunks:
             chunk_context = "\n\n---\n\n".join(relevant_chunks)
@@ -235,47 +1697,24 @@ class TranscriptionService:
         else:
             context_section = "No transcript context available."
 
-        system_prompt = f"""You're chatting with someone about their transcript. Be casual and brief - like talking to a friend.
+        # Static preamble first (cacheable prefix), then the varying context
+        messages = [
+            {"role": "system", "content": CHAT_SYSTEM_PROMPT, "_cacheable": True},
+            {"role": "system", "content": context_section},
+        ]
 
-Rules:
-- Only answer from the transcript below. If it's not there, say "I don't see that mentioned"
-- Keep it SHORT - 1-2 sentences is usually enough
-- Sound natural, not robotic
-- No bullet points unless they ask for a list
-- Answer directly - don't restate the question
-
-{context_section}"""
-
-        messages = [{"role": "system", "content": system_prompt}]
-
-        # Add chat history (limit configurable via MAX_CHAT_HISTORY env var)
+        # Add the most recent chat history: at most MAX_CHAT_HISTORY messages,
+        # and only as many as fit in CHAT_HISTORY_TOKENS, newest first
         if chat_history:
-            for msg in chat_history[-config.MAX_CHAT_HISTORY :]:
-                messages.append(
-                    {
-                        "role": msg["role"],
-                        "content": msg["content"],
-                    }
-                )
+            budget = config.CHAT_HISTORY_TOKENS
+            recent = []
+            for msg in reversed(chat_history[-config.MAX_CHAT_HISTORY :]):
+                budget -= _count_tokens(msg["content"])
+                if budget < 0:
+                    break
+                recent.append({"role": msg["role"], "content": msg["content"]})
+            messages.extend(reversed(recent))
 
         # Add current user message
         messages.append({"role": "user", "content": message})
-
-        # Try primary, then fallback
-        providers = [self.primary_provider]
-        if self.fallback_provider:
-            providers.append(self.fallback_provider)
-
-        for provider in providers:
-            try:
-                return provider.chat(
-                    messages=messages,
-                    temperature=0.2,
-                    max_tokens=1500,
-                    stream=stream,
-                )
-            except Exception as e:
-                logger.warning(f"{provider.name} chat failed: {e}")
-                continue
-
-        raise RuntimeError("No LLM providers available")
+        return messages
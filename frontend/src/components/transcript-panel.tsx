@@ -4,7 +4,7 @@ import * as React from "react";
 import { addTranscript, getTranscriptById } from "@/lib/history";
 import {
   transcribeAudio,
-  cleanText,
+  cleanTextWithTitle,
   fetchSystemPrompt,
   generateTitle,
   ApiError,
@@ -136,21 +136,29 @@ export function TranscriptPanel() {
         setIsProcessing(false);
 
         let cleaned: string | undefined;
+        let cleanedTitle: string | undefined;
         if (useLLM && rawResult) {
           setIsCleaningWithLLM(true);
-          cleaned = await cleanText(rawResult, systemPrompt || undefined);
+          // One LLM request returns both the cleaned text and its title
+          const result = await cleanTextWithTitle(rawResult, systemPrompt || undefined);
+          cleaned = result.text;
+          cleanedTitle = result.title;
           setCleanedText(cleaned);
           setIsCleaningWithLLM(false);
         }
 
-        // Generate AI title and save to history
+        // Generate AI title (unless cleaning already did) and save to history
         const titleSource = cleaned ?? rawResult;
         let title: string;
-        try {
-          title = await generateTitle(titleSource);
-        } catch {
-          // Fallback to first 3 words if AI fails
-          title = titleSource.trim().split(/\s+/).slice(0, 3).join(" ") || "Transcript";
+        if (cleanedTitle) {
+          title = cleanedTitle;
+        } else {
+          try {
+            title = await generateTitle(titleSource);
+          } catch {
+            // Fallback to first 3 words if AI fails
+            title = titleSource.trim().split(/\s+/).slice(0, 3).join(" ") || "Transcript";
+          }
         }
         const newTranscript = await addTranscript({
           title,
@@ -240,21 +248,29 @@ export function TranscriptPanel() {
         setIsProcessing(false);
 
         let cleaned: string | undefined;
+        let cleanedTitle: string | undefined;
         if (useLLM) {
           setIsCleaningWithLLM(true);
-          cleaned = await cleanText(text, systemPrompt || undefined);
+          // One LLM request returns both the cleaned text and its title
+          const result = await cleanTextWithTitle(text, systemPrompt || undefined);
+          cleaned = result.text;
+          cleanedTitle = result.title;
           setCleanedText(cleaned);
           setIsCleaningWithLLM(false);
         }
 
-        // Generate AI title and save to history
+        // Generate AI title (unless cleaning already did) and save to history
         const titleSource = cleaned ?? text;
         let title: string;
-        try {
-          title = await generateTitle(titleSource);
-        } catch {
-          // Fallback to first 3 words if AI fails
-          title = titleSource.trim().split(/\s+/).slice(0, 3).join(" ") || "Transcript";
+        if (cleanedTitle) {
+          title = cleanedTitle;
+        } else {
+          try {
+            title = await generateTitle(titleSource);
+          } catch {
+            // Fallback to first 3 words if AI fails
+            title = titleSource.trim().split(/\s+/).slice(0, 3).join(" ") || "Transcript";
+          }
         }
         const newTranscript = await addTranscript({
           title,
@@ -71,6 +71,7 @@ export const TranscribeResponseSchema = z.object({
 export const CleanResponseSchema = z.object({
   success: z.boolean(),
   text: z.string().optional(),
+  title: z.string().optional(),
 });
 
 export const ChatResponseSchema = z.object({
@@ -275,6 +276,21 @@ export async function cleanText(
   return data.text || "";
 }
 
+/** Clean text and get its title from a single LLM request. */
+export async function cleanTextWithTitle(
+  text: string,
+  systemPrompt?: string
+): Promise<{ text: string; title?: string }> {
+  const response = await fetch(`${API_BASE}/clean`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ text, system_prompt: systemPrompt, with_title: true }),
+  });
+
+  const data = await handleResponse(response, CleanResponseSchema);
+  return { text: data.text || "", title: data.title };
+}
+
 const GenerateTitleResponseSchema = z.object({
   success: z.boolean().optional(),
   title: z.string(),
@@ -1,6 +1,8 @@
+import compileall
+import json
 import os
+import re
 import sys
-import compileall
 
 REQUIRED_FILES = [
     "frontend/src/App.tsx",
@@ -16,19 +18,65 @@ REQUIRED_FILES = [
     "README.md",
 ]
 
+# Directories walked once for the required files; anything else is checked directly
+SCAN_ROOTS = ["frontend/src", "backend"]
+SKIP_DIRS = {".venv", "__pycache__", "node_modules"}
+
+def scan_files(root):
+    present = set()
+    stack = [root]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in SKIP_DIRS:
+                        stack.append(entry.path)
+                else:
+                    present.add(entry.path.replace(os.sep, "/"))
+    return present
+
 def check_files_exist():
-    missing = []
-    for f in REQUIRED_FILES:
-        if not os.path.exists(f):
-            missing.append(f)
-    return missing
+    required = set(REQUIRED_FILES)
+    present = set()
+    for root in SCAN_ROOTS:
+        if any(f.startswith(root + "/") for f in required):
+            present |= scan_files(root)
+    for f in required - present:
+        if not any(f.startswith(root + "/") for root in SCAN_ROOTS) and os.access(f, os.F_OK):
+            present.add(f)
+    return sorted(required - present)
+
+# Source mtimes from the last clean syntax check; unchanged trees skip compiling
+CACHE_FILE = ".integrity_cache.json"
+SKIP_RX = re.compile(r"(^|/)(\.venv|__pycache__|node_modules)/")
+
+def python_mtimes(root):
+    sources = (f for f in scan_files(root) if f.endswith(".py"))
+    return {f: os.stat(f).st_mtime_ns for f in sorted(sources)}
+
+def load_cache():
+    try:
+        with open(CACHE_FILE) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
 
 def check_python_syntax():
     print("Checking Python syntax...")
     try:
-        # This will compile all python files in backend/ and report errors
-        if not compileall.compile_dir('backend', force=True, quiet=1):
+        mtimes = python_mtimes('backend')
+        if load_cache() == mtimes:
+            print("Python sources unchanged since last check, skipping.")
+            return True
+        # This will compile all python files in backend/ (one process per core) and report errors
+        if not compileall.compile_dir('backend', force=True, quiet=1, workers=0, rx=SKIP_RX):
             return False
+        with open(CACHE_FILE, "w") as fh:
+            json.dump(mtimes, fh)
         return True
     except Exception as e:
         print(f"Error checking python syntax: {e}")